@@ -0,0 +1,69 @@
+"""
+archive.py
+
+Created by Luca Camerani at 18/10/2026, University of Milano-Bicocca.
+(l.camerani@campus.unimib.it)
+All rights reserved.
+
+This file is part of the EcoFin-Library (https://github.com/LucaCamerani/EcoFin-Library),
+and is released under the "BSD Open Source License".
+"""
+
+from urllib.parse import urlencode, urlsplit, parse_qsl, urlunsplit
+
+import requests
+
+from EcoFin.dataDownload.cache import DiskCache
+
+
+class Archive():
+    def __init__(self, path: str, mode: str = 'replay'):
+        """
+        Archive of raw HTTP responses keyed by URL and parameters.
+        Modes:
+            * record -> every downloaded response is written to the archive;
+            * replay -> responses are served from the archive only (no network access).
+        """
+        if mode not in ['record', 'replay']:
+            raise ValueError('Invalid archive mode: {}'.format(mode))
+
+        self.path = path
+        self.mode = mode
+        self.store = DiskCache(path, bytelimit=float('inf'))
+
+    @staticmethod
+    def getKey(url: str, params: dict = None):
+        """
+        Canonical request key: URL with query parameters (None values dropped) sorted by name.
+        """
+        parts = urlsplit(url)
+        query = parse_qsl(parts.query, keep_blank_values=True)
+        if params is not None:
+            query += [(k, str(v)) for k, v in params.items() if v is not None]
+
+        return urlunsplit((parts.scheme, parts.netloc, parts.path, urlencode(sorted(query)), ''))
+
+    def record(self, url: str, params: dict, response: requests.Response):
+        self.store.add(self.getKey(url, params), {'status': response.status_code,
+                                                  'encoding': response.encoding,
+                                                  'content': response.content})
+
+    def replay(self, url: str, params: dict = None):
+        """
+        Returns the archived response as a requests.Response object.
+        """
+        key = self.getKey(url, params)
+        data = self.store.read(key)
+        if data is False:
+            raise RuntimeError('Request not in archive (replay mode): {}'.format(key))
+
+        response = requests.Response()
+        response.url = key
+        response.status_code = data['status']
+        response.encoding = data['encoding']
+        response._content = data['content']
+
+        return response
+
+    def keyExists(self, url: str, params: dict = None):
+        return self.store.keyExists(self.getKey(url, params))
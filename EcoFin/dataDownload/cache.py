@@ -9,25 +9,90 @@ This file is part of the EcoFin-Library (https://github.com/LucaCamerani/EcoFin-
 and is released under the "BSD Open Source License".
 """
 
+import hashlib
+import os
 import pickle
+import re
+import sqlite3
+import threading
+import time
+import zlib
+from collections import OrderedDict, namedtuple
+from contextlib import contextmanager
 
-from collections import namedtuple
-from sys import getsizeof
+try:
+    import lz4.frame as lz4
+except ImportError:
+    lz4 = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Codec tags prefixed to stored blobs, so that entries stay readable whatever codec wrote them
+CODECS = {b'L': 'lz4', b'S': 'zstd', b'Z': 'zlib', b'-': 'raw'}
+
+
+def serialize(var, compress=True):
+    data = pickle.dumps(var, protocol=pickle.HIGHEST_PROTOCOL)
+    if not compress:
+        return b'-' + data
+    elif lz4 is not None:
+        return b'L' + lz4.compress(data)
+    elif zstandard is not None:
+        return b'S' + zstandard.ZstdCompressor(level=3).compress(data)
+    else:
+        return b'Z' + zlib.compress(data, 1)
+
+
+def deserialize(blob: bytes):
+    codec, data = blob[:1], memoryview(blob)[1:]
+    if codec == b'L':
+        data = lz4.decompress(data)
+    elif codec == b'S':
+        data = zstandard.ZstdDecompressor().decompress(data)
+    elif codec == b'Z':
+        data = zlib.decompress(data)
+
+    return pickle.loads(data)
 
 
 class Cache():
-    def __init__(self, path=None, bytelimit=5000):
+    def __init__(self, path=None, bytelimit=256 * 2 ** 20, compress=True):
+        """
+        In-memory LRU cache. Items are stored serialized (compressed with lz4, zstd or zlib,
+        whichever is available) and decoded on read; the least recently used ones are
+        evicted once their total size exceeds bytelimit.
+        """
         self.bytelimit = bytelimit
-        if path is None:
-            self.cache = {}
-        else:
-            with open(path) as f:
-                self.cache = pickle.load(f)
+        self.compress = compress
+        self.cache = OrderedDict()
+        self.bytes = 0
+        self.lock = threading.RLock()
+        if path is not None:
+            with open(path, 'rb') as f:
+                for key, var in pickle.load(f).items():
+                    self.add(key, var)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state.update(lock=None)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.lock = threading.RLock()
 
     def add(self, key: (str, int), var):
         try:
-            self.clearCache()
-            self.cache[str(key)] = var
+            key = str(key)
+            blob = serialize(var, self.compress)
+            with self.lock:
+                self.drop(key)
+                self.cache[key] = blob
+                self.bytes += len(blob)
+                self.clearCache()
         except Exception as e:
             print(e)
             pass
@@ -35,14 +100,18 @@ class Cache():
         return self.cache
 
     def drop(self, key: (str, int)):
-        try:
-            del self.cache[key]
-        except:
-            pass
+        with self.lock:
+            try:
+                self.bytes -= len(self.cache.pop(key))
+            except:
+                pass
 
     def read(self, key: (str, int)):
         try:
-            return self.cache[key]
+            with self.lock:
+                self.cache.move_to_end(key)
+                blob = self.cache[key]
+            return deserialize(blob)
         except:
             return False
             pass
@@ -54,22 +123,206 @@ class Cache():
             return False
 
     def getCache(self):
-        return self.cache
+        with self.lock:
+            items = list(self.cache.items())
+
+        return {key: deserialize(blob) for key, blob in items}
 
     def getCacheSize(self):
+        with self.lock:
+            return namedtuple('Size', ['len', 'bytes'])(**{
+                "len": len(self.cache),
+                "bytes": self.bytes
+            })
+
+    def clearCache(self):
+        with self.lock:
+            while self.bytes > self.bytelimit and len(self.cache) > 1:
+                self.drop(next(iter(self.cache)))
+
+    def storeCache(self, path: str):
+        try:
+            with open(path, 'wb') as f:
+                pickle.dump(self.getCache(), f, protocol=pickle.HIGHEST_PROTOCOL)
+            return True
+        except:
+            pass
+            return False
+
+    def printCache(self):
+        summary = self.getCacheSize()
+        print('Cache status:\n • Items: {}\n • Bytes: {}'.format(summary.len, summary.bytes))
+        with self.lock:
+            print('Data:\n{}'.format([(key, len(blob)) for key, blob in self.cache.items()]))
+
+
+class DiskCache():
+    def __init__(self, path: str, bytelimit=2 ** 30, ttl: dict = None, defaultTTL: float = None,
+                 compress=True, mmapSize=256 * 2 ** 20):
+        """
+        Persistent cache stored in a SQLite database (WAL mode, safe to share between processes).
+        Entries are addressed by the SHA-1 of their key and expire according to ttl, a dict
+        {regex: seconds} matched against the key (first match wins, defaultTTL otherwise; None
+        means no expiration). The least recently read entries are evicted once bytelimit is exceeded.
+        Values are stored compressed (see Cache); up to mmapSize bytes of the file are read memory-mapped.
+        """
+        self.path = path
+        self.bytelimit = bytelimit
+        self.compress = compress
+        self.mmapSize = mmapSize
+        self.ttl = [(re.compile(pattern), seconds) for pattern, seconds in (ttl or {}).items()]
+        self.defaultTTL = defaultTTL
+        self.lock = threading.RLock()
+        self.connection = None
+        self.pid = None
+
+        with self.transaction() as db:
+            db.execute('CREATE TABLE IF NOT EXISTS cache ('
+                       'hash TEXT PRIMARY KEY, key TEXT NOT NULL, value BLOB NOT NULL, '
+                       'bytes INTEGER NOT NULL, expires REAL, accessed REAL NOT NULL)')
+            db.execute('CREATE INDEX IF NOT EXISTS cache_accessed ON cache(accessed)')
+            db.execute('CREATE INDEX IF NOT EXISTS cache_expires ON cache(expires)')
+            db.execute('CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value INTEGER NOT NULL)')
+            db.execute("INSERT OR IGNORE INTO meta VALUES ('bytes', 0)")
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state.update(lock=None, connection=None, pid=None)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.lock = threading.RLock()
+
+    def connect(self):
+        """
+        Returns the connection of the current process (a new one is opened after a fork).
+        """
+        with self.lock:
+            if self.connection is None or self.pid != os.getpid():
+                self.connection = sqlite3.connect(self.path, timeout=60, isolation_level=None,
+                                                  check_same_thread=False)
+                self.connection.execute('PRAGMA journal_mode=WAL')
+                self.connection.execute('PRAGMA synchronous=NORMAL')
+                self.connection.execute('PRAGMA mmap_size={}'.format(int(self.mmapSize)))
+                self.pid = os.getpid()
+
+            return self.connection
+
+    @contextmanager
+    def transaction(self):
+        with self.lock:
+            db = self.connect()
+            db.execute('BEGIN IMMEDIATE')
+            try:
+                yield db
+                db.execute('COMMIT')
+            except BaseException:
+                db.execute('ROLLBACK')
+                raise
+
+    def query(self, sql: str, parameters: tuple = ()):
+        with self.lock:
+            return self.connect().execute(sql, parameters).fetchall()
+
+    @staticmethod
+    def hash(key: (str, int)):
+        return hashlib.sha1(str(key).encode()).hexdigest()
+
+    def getTTL(self, key: str):
+        for pattern, seconds in self.ttl:
+            if pattern.search(key):
+                return seconds
+
+        return self.defaultTTL
+
+    def add(self, key: (str, int), var):
+        key = str(key)
+        try:
+            value = serialize(var, self.compress)
+            ttl = self.getTTL(key)
+            now = time.time()
+            expires = None if ttl is None else now + ttl
+
+            with self.transaction() as db:
+                self._delete(db, self.hash(key))
+                db.execute('INSERT INTO cache VALUES (?, ?, ?, ?, ?, ?)',
+                           (self.hash(key), key, value, len(value), expires, now))
+                db.execute("UPDATE meta SET value = value + ? WHERE name = 'bytes'", (len(value),))
+            self.clearCache()
+        except Exception as e:
+            print(e)
+            pass
+
+    def _delete(self, db, hash: str):
+        row = db.execute('SELECT bytes FROM cache WHERE hash = ?', (hash,)).fetchone()
+        if row is not None:
+            db.execute('DELETE FROM cache WHERE hash = ?', (hash,))
+            db.execute("UPDATE meta SET value = value - ? WHERE name = 'bytes'", (row[0],))
+
+    def drop(self, key: (str, int)):
+        with self.transaction() as db:
+            self._delete(db, self.hash(key))
+
+    def read(self, key: (str, int)):
+        hash = self.hash(key)
+        rows = self.query('SELECT value, expires, accessed FROM cache WHERE hash = ?', (hash,))
+        if len(rows) == 0:
+            return False
+
+        value, expires, accessed = rows[0]
+        now = time.time()
+        if expires is not None and expires < now:
+            self.drop(key)
+            return False
+        elif accessed < now - 60:  # LRU clock with 1 minute resolution, to limit writes
+            with self.transaction() as db:
+                db.execute('UPDATE cache SET accessed = ? WHERE hash = ?', (now, hash))
+
+        return deserialize(value)
+
+    def keyExists(self, key: (str, int)):
+        rows = self.query('SELECT expires FROM cache WHERE hash = ?', (self.hash(key),))
+
+        return len(rows) > 0 and (rows[0][0] is None or rows[0][0] >= time.time())
+
+    def getCache(self):
+        keys = [row[0] for row in self.query('SELECT key FROM cache')]
+
+        return {key: self.read(key) for key in keys}
+
+    def getCacheSize(self):
+        items = self.query('SELECT COUNT(*) FROM cache')[0][0]
+        bytes = self.query("SELECT value FROM meta WHERE name = 'bytes'")[0][0]
+
         return namedtuple('Size', ['len', 'bytes'])(**{
-            "len": len(self.cache),
-            "bytes": getsizeof(self.cache)
+            "len": items,
+            "bytes": bytes
         })
 
     def clearCache(self):
-        if self.getCacheSize().bytes >= self.bytelimit:
-            self.cache = {}
+        """
+        Drop expired entries, then evict the least recently used ones until the cache fits bytelimit.
+        """
+        now = time.time()
+        if len(self.query('SELECT 1 FROM cache WHERE expires < ? LIMIT 1', (now,))) > 0:
+            with self.transaction() as db:
+                for hash, in db.execute('SELECT hash FROM cache WHERE expires < ?', (now,)).fetchall():
+                    self._delete(db, hash)
+
+        if self.query("SELECT value FROM meta WHERE name = 'bytes'")[0][0] > self.bytelimit:
+            with self.transaction() as db:
+                excess = db.execute("SELECT value FROM meta WHERE name = 'bytes'").fetchone()[0] - self.bytelimit
+                for hash, bytes in db.execute('SELECT hash, bytes FROM cache ORDER BY accessed').fetchall():
+                    if excess <= 0:
+                        break
+                    self._delete(db, hash)
+                    excess -= bytes
 
     def storeCache(self, path: str):
         try:
-            with open(path, 'w') as f:
-                pickle.dump([self.cache], f)
+            with self.lock, sqlite3.connect(path) as target:
+                self.connect().backup(target)
             return True
         except:
             pass
@@ -78,4 +331,5 @@ class Cache():
     def printCache(self):
         summary = self.getCacheSize()
         print('Cache status:\n • Items: {}\n • Bytes: {}'.format(summary.len, summary.bytes))
-        print('Data:\n{}'.format([(key, type(self.cache[key])) for key in self.cache.keys()]))
+        keys = [row[0] for row in self.query('SELECT key FROM cache ORDER BY accessed')]
+        print('Data:\n{}'.format(keys))
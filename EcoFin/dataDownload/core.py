@@ -9,11 +9,13 @@ This file is part of the EcoFin-Library (https://github.com/LucaCamerani/EcoFin-
 and is released under the "BSD Open Source License".
 """
 
+import asyncio
+import numbers
+import time
 from collections import namedtuple
 
 import numpy as np
 import pandas as pd
-import requests
 
 from EcoFin.dataDownload import functions as fc
 from EcoFin.dataDownload import shared
@@ -29,6 +31,7 @@ class TickerCore():
         self.ticker = ticker.upper()
         self.history = None
         self.baseUrl = shared.baseUrl
+        self.provider = shared.getProvider()
 
         self.fundamentals = False
         self._info = None
@@ -91,30 +94,152 @@ class TickerCore():
                 debug: bool
                     Optional. If passed as False, will suppress
                     error message printing to console.
+        Note: if shared.use_history_store, only the ranges not yet downloaded are requested.
         """
-        params = {"period1": start, "period2": end}
-        params["events"] = "div,splits"
+        if self.isStorable(interval, start, end):
+            df = self.getStoredHistory(interval, start, end, autoAdjust, backAdjust, proxy, rounding, **kwargs)
+        else:
+            df = self.downloadHistory(interval, start, end, autoAdjust, backAdjust, proxy, rounding, **kwargs)
+
+        return self.setHistory(df, actions)
+
+    async def agetHistory(self, interval="1d",
+                          start=None, end=None, actions=True,
+                          autoAdjust=True, backAdjust=False,
+                          proxy=None, rounding=True, **kwargs):
+        """
+        Async version of getHistory (missing ranges are downloaded concurrently).
+        """
+        if self.isStorable(interval, start, end):
+            df = await self.agetStoredHistory(interval, start, end, autoAdjust, backAdjust, proxy, rounding, **kwargs)
+        else:
+            df = await self.adownloadHistory(interval, start, end, autoAdjust, backAdjust, proxy, rounding, **kwargs)
+
+        return self.setHistory(df, actions)
+
+    @staticmethod
+    def isStorable(interval, start, end):
+        return shared.use_history_store and interval in ['1d', '5d', '1wk', '1mo', '3mo'] \
+               and isinstance(start, (numbers.Real, type(None))) and isinstance(end, (numbers.Real, type(None)))
+
+    def setHistory(self, df: pd.DataFrame, actions=True):
+        if "Dividends" not in df.columns:
+            return df
+
+        self.history = df.copy()
+
+        if not actions:
+            df.drop(columns=["Dividends", "Stock Splits"], inplace=True)
+
+        return df.drop_duplicates()
+
+    def getStoredHistory(self, interval="1d", start=None, end=None,
+                         autoAdjust=True, backAdjust=False,
+                         proxy=None, rounding=True, **kwargs):
+        """
+        Returns the [start, end) history from shared.history_store, downloading only the missing ranges.
+        Bars are selected on their raw timestamp, as in a direct download; open-ended requests (end=None)
+        are refreshed when older than shared.history_ttl seconds.
+        A gap reaching end is downloaded up to shared.history_lookahead seconds further, so that loops
+        moving end forward are served from memory. Ranges are stored only once successfully parsed.
+        """
+        key, start, stop, gaps = self.getHistoryGaps(interval, start, end, autoAdjust, backAdjust, rounding)
+        for gapStart, gapEnd, period1, period2 in gaps:
+            data = self.downloadHistory(interval, period1, period2, autoAdjust, backAdjust, proxy, rounding,
+                                        epochs=True, **kwargs)
+            if "Dividends" in data.columns:
+                shared.history_store.add(key, gapStart, gapEnd, data)
+
+        return self.sliceHistory(key, start, stop)
+
+    async def agetStoredHistory(self, interval="1d", start=None, end=None,
+                                autoAdjust=True, backAdjust=False,
+                                proxy=None, rounding=True, **kwargs):
+        """
+        Async version of getStoredHistory.
+        """
+        key, start, stop, gaps = self.getHistoryGaps(interval, start, end, autoAdjust, backAdjust, rounding)
+        data = await asyncio.gather(*[self.adownloadHistory(interval, period1, period2, autoAdjust, backAdjust,
+                                                            proxy, rounding, epochs=True, **kwargs)
+                                      for _, _, period1, period2 in gaps])
+        for (gapStart, gapEnd, _, _), df in zip(gaps, data):
+            if "Dividends" in df.columns:
+                shared.history_store.add(key, gapStart, gapEnd, df)
+
+        return self.sliceHistory(key, start, stop)
+
+    def getHistoryGaps(self, interval="1d", start=None, end=None, autoAdjust=True, backAdjust=False, rounding=True):
+        """
+        Returns (store key, start, stop, list of (start, end, period1, period2) ranges to download,
+        with the request bounds: None for an open bound, so that open-ended requests keep a stable cache key).
+        See getStoredHistory.
+        """
+        key = (self.provider, self.ticker, interval, autoAdjust, backAdjust, rounding)
+        now = int(time.time())
+        start = 0 if start is None else int(start)
+        stop = now if end is None else int(end)
+        horizon = stop if end is None else max(stop, min(now - now % 86400, stop + shared.history_lookahead))
+
+        gaps = []
+        for gapStart, gapEnd in shared.history_store.getGaps(key, start, horizon):
+            if gapStart >= stop:
+                break
+            if end is None and gapStart >= stop - shared.history_ttl:
+                continue
+            gapStart -= gapStart % 86400
+            gaps.append((gapStart, gapEnd, None if gapStart == 0 else gapStart,
+                         None if end is None and gapEnd >= stop else gapEnd))
+
+        return key, start, stop, gaps
+
+    @staticmethod
+    def sliceHistory(key, start: int, stop: int):
+        df = shared.history_store.slice(key, start, stop)
+        if df is None:
+            return fc.emptyDataSerie()
+
+        return df
+
+    def downloadHistory(self, interval="1d", start=None, end=None,
+                        autoAdjust=True, backAdjust=False,
+                        proxy=None, rounding=True, **kwargs):
+        """
+        Download and parse the history (with actions) in a single request. See getHistory.
+        """
+        # Getting data from json
+        data = self.provider.history(self.ticker, start, end, proxy=self.formatProxy(proxy))
+
+        return self.parseHistory(data, interval, autoAdjust, backAdjust, rounding, **kwargs)
+
+    async def adownloadHistory(self, interval="1d", start=None, end=None,
+                               autoAdjust=True, backAdjust=False,
+                               proxy=None, rounding=True, **kwargs):
+        """
+        Async version of downloadHistory.
+        """
+        data = await self.provider.ahistory(self.ticker, start, end, proxy=self.formatProxy(proxy))
 
-        # setup proxy in requests format
+        return self.parseHistory(data, interval, autoAdjust, backAdjust, rounding, **kwargs)
+
+    @staticmethod
+    def formatProxy(proxy):
+        """
+        Returns proxy in requests format.
+        """
         if proxy is not None:
             if isinstance(proxy, dict) and "https" in proxy:
                 proxy = proxy["https"]
             proxy = {"https": proxy}
 
-        # Getting data from json
-        url = "{}/v8/finance/chart/{}".format(self.baseUrl, self.ticker)
-        key = '{}?{}'.format(url, '&'.join(['{}={}'.format(k, d) for k, d in params.items()]))
-        if shared.show_url: print('Connection request: {}'.format(key))
-
-        if shared.use_cache & shared.session_cache.keyExists(key):
-            data = shared.session_cache.read(key)
-        else:
-            data = requests.get(url=url, params=params, proxies=proxy)
-            if "Server" in data.text:
-                raise RuntimeError("Data provider is currently down!")
-            data = data.json()
-            shared.session_cache.add(key=key, var=data)
+        return proxy
 
+    def parseHistory(self, data: dict, interval="1d", autoAdjust=True, backAdjust=False, rounding=True,
+                     epochs=False, **kwargs):
+        """
+        Parse a chart payload into the history DataFrame (with actions). See getHistory.
+        If epochs (history store gaps), the raw bar timestamps are kept in an 'Epoch' column (see fc.parseChart)
+        and a result without bars is returned as an empty history instead of an error.
+        """
         # Clean up errors
         debug_mode = True
         if "debug" in kwargs and isinstance(kwargs["debug"], bool):
@@ -138,8 +263,17 @@ class TickerCore():
 
             return shared.DFS[self.ticker]
 
-        # parse quotes
+        # a store gap without new bars (weekends, before the open) comes without timestamps:
+        # parse it as an empty history, so that the gap is marked as covered
+        result = data["chart"]["result"][0]
+        if epochs and "timestamp" not in result:
+            result = dict(result, timestamp=[], indicators={
+                "quote": [dict.fromkeys(["open", "high", "low", "close", "volume"], [])]})
+
+        # parse quotes (numpy fast path, except for the 30m resampling below)
         try:
+            if interval.lower() != "30m":
+                return fc.parseChart(result, autoAdjust, backAdjust, rounding, epochs)
             quotes = fc.parseQuotes(data["chart"]["result"][0])
         except Exception:
             shared.DFS[self.ticker] = fc.emptyDataSerie()
@@ -193,12 +327,7 @@ class TickerCore():
         df.index = pd.to_datetime(df.index.date)
         df.index.name = "Date"
 
-        self.history = df.copy()
-
-        if not actions:
-            df.drop(columns=["Dividends", "Stock Splits"], inplace=True)
-
-        return df.drop_duplicates()
+        return df
 
     def getDividends(self, proxy=None):
         if self.history is None:
@@ -222,20 +351,8 @@ class TickerCore():
         return actions[actions != 0].dropna(how='all').fillna(0)
 
     def getInfo(self):
-        url = "{}/quote/{}".format(self.baseUrl, self.ticker)
-        if shared.show_url: print('Connection request: {}'.format(url))
-
         try:
-            if shared.use_cache & shared.session_cache.keyExists(url):
-                data = shared.session_cache.read(url)
-            else:
-                data = requests.get(url=url)
-                if "Server" in data.text:
-                    raise RuntimeError("Data provider is currently down!")
-
-                data = data.json()
-                shared.session_cache.add(key=url, var=data)
-
+            data = self.provider.quote(self.ticker)
         except:
             data = {"index": 0,
                     "Ticker": None,
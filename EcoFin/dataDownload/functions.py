@@ -9,17 +9,29 @@ This file is part of the EcoFin-Library (https://github.com/LucaCamerani/EcoFin-
 and is released under the "BSD Open Source License".
 """
 
+import asyncio
 import re
+import threading
+import time
+import weakref
+from concurrent.futures import Future
 
 import numpy as np
 import pandas as pd
 import requests
 
+from EcoFin.dataDownload import shared
+
 try:
     import ujson as json
 except ImportError:
     import json as json
 
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
 
 def emptyDataSerie(index=[]):
     empty = pd.DataFrame(index=index, data={
@@ -58,15 +70,291 @@ def parseQuotes(data, tz=None):
     return quotes
 
 
+def parseChart(data, autoAdjust=True, backAdjust=False, rounding=True, epochs=False):
+    """
+    Fast path: decode a chart result straight into numpy arrays (adjustments, rounding, events
+    alignment and timezone conversion are done in place) and build a single DataFrame.
+    Equivalent to parseQuotes + autoAdjust/backAdjust + parseEvents as combined by TickerCore.
+    If epochs, the raw unixtimestamp of each bar is kept in an 'Epoch' column.
+    """
+    timestamps = np.asarray(data["timestamp"], dtype=np.int64)
+    ohlc = data["indicators"]["quote"][0]
+    order = np.argsort(timestamps, kind='mergesort')
+
+    def column(values):
+        return np.asarray(values, dtype=np.float64)[order]
+
+    timestamps = timestamps[order]
+    opens, highs, lows = column(ohlc["open"]), column(ohlc["high"]), column(ohlc["low"])
+    closes, volumes = column(ohlc["close"]), column(ohlc["volume"])
+    if "adjclose" in data["indicators"]:
+        adjclose = column(data["indicators"]["adjclose"][0]["adjclose"])
+    else:
+        adjclose = closes.copy()
+
+    if autoAdjust:
+        ratio = adjclose / closes
+        for values in (opens, highs, lows):
+            np.multiply(values, ratio, out=values)
+        closes = adjclose
+        columns = {"Open": opens, "High": highs, "Low": lows, "Close": closes}
+    elif backAdjust:
+        ratio = adjclose / closes
+        for values in (opens, highs, lows):
+            np.multiply(values, ratio, out=values)
+        columns = {"Open": opens, "High": highs, "Low": lows, "Close": closes}
+    else:
+        columns = {"Open": opens, "High": highs, "Low": lows, "Close": closes, "Adj Close": adjclose}
+
+    if rounding:
+        for values in columns.values():
+            np.round(values, data["meta"]["priceHint"], out=values)
+        np.round(volumes, data["meta"]["priceHint"], out=volumes)
+    volumes[np.isnan(volumes)] = 0
+
+    valid = np.ones(len(timestamps), dtype=bool)
+    for values in columns.values():
+        valid &= ~np.isnan(values)
+    timestamps = timestamps[valid]
+    columns = {name: values[valid] for name, values in columns.items()}
+    columns["Volume"] = volumes[valid].astype(np.int64)
+
+    # events
+    events = {"Dividends": ({}, None), "Stock Splits": ({}, None)}
+    if "events" in data:
+        if "dividends" in data["events"]:
+            events["Dividends"] = data["events"]["dividends"], lambda e: e["amount"]
+        if "splits" in data["events"]:
+            events["Stock Splits"] = data["events"]["splits"], lambda e: e["numerator"] / e["denominator"]
+
+    eventDates = np.asarray([e["date"] for values, _ in events.values() for e in values.values()], dtype=np.int64)
+    extra = np.setdiff1d(eventDates, timestamps)
+    if len(extra) > 0:
+        timestamps = np.concatenate([timestamps, extra])
+        order = np.argsort(timestamps, kind='mergesort')
+        timestamps = timestamps[order]
+        columns = {name: np.concatenate([values, np.full(len(extra), np.nan)])[order]
+                   for name, values in columns.items()}
+
+    for name, (values, parse) in events.items():
+        columns[name] = np.zeros(len(timestamps))
+        if len(values) > 0:
+            dates = np.asarray([e["date"] for e in values.values()], dtype=np.int64)
+            columns[name][np.searchsorted(timestamps, dates)] = [parse(e) for e in values.values()]
+    if epochs:
+        columns["Epoch"] = timestamps
+
+    # index eod/intraday
+    index = pd.to_datetime(timestamps, unit="s", utc=True).tz_convert(data["meta"]["exchangeTimezoneName"])
+    index = index.normalize().tz_localize(None)
+    index.name = "Date"
+
+    return pd.DataFrame(columns, index=index)
+
+
 def camel2title(o):
     return [re.sub("([a-z])([A-Z])", "\g<1> \g<2>", i).title() for i in o]
 
 
+def isProviderDown(response):
+    return "Server" in response.text
+
+
+def download(url, params=None, proxy=None, check=True):
+    """
+    GET request through the shared connection pool, paced by shared.rate_limiter.
+    Responses with a shared.retry_statuses status or a provider-down reply are retried (up to shared.retries
+    times, with exponential backoff), each attempt taking its own token and reporting its outcome to the limiter.
+    If shared.archive is set, responses are recorded to (or, in replay mode, served only from) it.
+    """
+    if shared.archive is not None and shared.archive.mode == 'replay':
+        response = shared.archive.replay(url, params)
+        if check and isProviderDown(response):
+            raise RuntimeError("Data provider is currently down!")
+
+        return response
+
+    for attempt in range(shared.retries + 1):
+        with shared.rate_limiter.request(url) as report:
+            response = shared.getSession().get(url=url, params=params, proxies=proxy, timeout=shared.timeout)
+            down = check and isProviderDown(response)
+            report(response.status_code != 429 and response.status_code < 500 and not down)
+
+        if not (down or response.status_code in shared.retry_statuses) or attempt == shared.retries:
+            break
+        time.sleep(shared.backoff * 2 ** attempt)
+
+    if down:
+        raise RuntimeError("Data provider is currently down!")
+
+    if shared.archive is not None:
+        shared.archive.record(url, params, response)
+
+    return response
+
+
+_inflight = {}
+_inflight_lock = threading.Lock()
+
+
+def readCache(key: str, url: str, params: dict = None):
+    """
+    Returns the session_cache payload of key, or False. In archive record mode, hits not yet
+    in the archive are recorded too, so that a later replay does not depend on the cache.
+    """
+    if shared.use_cache & shared.session_cache.keyExists(key):
+        data = shared.session_cache.read(key)
+        if shared.archive is not None and shared.archive.mode == 'record' and not shared.archive.keyExists(url, params):
+            response = requests.Response()
+            response.status_code = 200
+            response.encoding = 'utf-8'
+            response._content = json.dumps(data).encode('utf-8')
+            shared.archive.record(url, params, response)
+
+        return data
+
+    return False
+
+
+def fetchJson(url, params=None, key=None, proxy=None, check=False):
+    """
+    Returns the JSON payload of url, reading/writing session_cache under key (default: url).
+    check enables the provider-down test of download (for endpoints where that reply means the provider is down).
+    Concurrent requests for the same key are coalesced: the first caller downloads, the others wait for it.
+    """
+    if key is None: key = url
+    if shared.show_url: print('Connection request: {}'.format(key))
+
+    data = readCache(key, url, params)
+    if data is not False:
+        return data
+
+    with _inflight_lock:
+        future = _inflight.get(key)
+        leader = future is None
+        if leader:
+            future = _inflight[key] = Future()
+
+    if not leader:
+        return future.result()
+
+    try:
+        data = readCache(key, url, params)
+        if data is False:
+            data = download(url, params=params, proxy=proxy, check=check).json()
+            shared.session_cache.add(key=key, var=data)
+        future.set_result(data)
+    except Exception as e:
+        future.set_exception(e)
+        raise
+    finally:
+        with _inflight_lock:
+            del _inflight[key]
+
+    return data
+
+
+_asessions = weakref.WeakKeyDictionary()
+_ainflight = weakref.WeakKeyDictionary()
+
+
+def getAsyncSession():
+    """
+    Returns the aiohttp session of the running event loop (one connection pool per loop).
+    """
+    loop = asyncio.get_running_loop()
+    session = _asessions.get(loop)
+    if session is None or session.closed:
+        connector = aiohttp.TCPConnector(limit=0, limit_per_host=shared.pool_size)
+        session = _asessions[loop] = aiohttp.ClientSession(
+            connector=connector, timeout=aiohttp.ClientTimeout(total=shared.timeout))
+
+    return session
+
+
+async def acloseSession():
+    session = _asessions.pop(asyncio.get_running_loop(), None)
+    if session is not None:
+        await session.close()
+
+
+async def adownload(url, params=None, proxy=None, check=True):
+    """
+    Async version of download, returning a requests.Response (same pacing, retries and archive).
+    Requires aiohttp (pip install EcoFin[async]); without it (or in archive replay mode) download runs in the
+    default executor, one thread per request.
+    """
+    if aiohttp is None or (shared.archive is not None and shared.archive.mode == 'replay'):
+        return await asyncio.get_running_loop().run_in_executor(None, lambda: download(url, params, proxy, check))
+
+    query = None if params is None else {k: str(v) for k, v in params.items() if v is not None}
+    if isinstance(proxy, dict):
+        proxy = proxy.get(url.split(':')[0])
+
+    for attempt in range(shared.retries + 1):
+        try:
+            async with shared.rate_limiter.arequest(url) as report:
+                async with getAsyncSession().get(url, params=query, proxy=proxy) as r:
+                    response = requests.Response()
+                    response.url = str(r.url)
+                    response.status_code = r.status
+                    response.encoding = r.charset
+                    response._content = await r.read()
+                down = check and isProviderDown(response)
+                report(r.status != 429 and r.status < 500 and not down)
+        except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+            if attempt == shared.retries:
+                raise
+        else:
+            if not (down or response.status_code in shared.retry_statuses) or attempt == shared.retries:
+                break
+        await asyncio.sleep(shared.backoff * 2 ** attempt)
+
+    if down:
+        raise RuntimeError("Data provider is currently down!")
+
+    if shared.archive is not None:
+        shared.archive.record(url, params, response)
+
+    return response
+
+
+async def afetchJson(url, params=None, key=None, proxy=None, check=False):
+    """
+    Async version of fetchJson (same session_cache; concurrent requests for a key coalesced on each event loop).
+    """
+    if key is None: key = url
+    if shared.show_url: print('Connection request: {}'.format(key))
+
+    data = readCache(key, url, params)
+    if data is not False:
+        return data
+
+    loop = asyncio.get_running_loop()
+    inflight = _ainflight.setdefault(loop, {})
+    if key in inflight:
+        return await asyncio.shield(inflight[key])
+
+    future = inflight[key] = loop.create_future()
+    future.add_done_callback(lambda f: f.cancelled() or f.exception())  # no warning if nobody waits
+    try:
+        data = (await adownload(url, params=params, proxy=proxy, check=check)).json()
+        shared.session_cache.add(key=key, var=data)
+        future.set_result(data)
+    except BaseException as e:
+        future.set_exception(e)
+        raise
+    finally:
+        del inflight[key]
+
+    return data
+
+
 def getJson(url, proxy=None):
-    html = requests.get(url=url, proxies=proxy).text
+    html = download(url, proxy=proxy, check=False).text
 
     if "QuoteSummaryStore" not in html:
-        html = requests.get(url=url, proxies=proxy).text
+        html = download(url, proxy=proxy, check=False).text
         if "QuoteSummaryStore" not in html:
             return {}
 
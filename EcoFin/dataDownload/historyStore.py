@@ -0,0 +1,99 @@
+"""
+historyStore.py
+
+Created by Luca Camerani at 18/10/2026, University of Milano-Bicocca.
+(l.camerani@campus.unimib.it)
+All rights reserved.
+
+This file is part of the EcoFin-Library (https://github.com/LucaCamerani/EcoFin-Library),
+and is released under the "BSD Open Source License".
+"""
+
+import threading
+
+import numpy as np
+import pandas as pd
+
+
+class HistoryStore():
+    def __init__(self):
+        """
+        In-memory store of downloaded histories. For each key it keeps the merged data and
+        the (sorted, disjoint) list of [start, end) unixtimestamp ranges already downloaded.
+        Rows are matched to ranges on their 'Epoch' column (raw bar timestamp) if present, else on the index.
+        """
+        self.data = {}
+        self.ranges = {}
+        self.lock = threading.RLock()
+
+    def getGaps(self, key, start: int, end: int):
+        """
+        Returns the list of [start, end) ranges not yet covered for key.
+        """
+        gaps = []
+        cursor = start
+        with self.lock:
+            for a, b in self.ranges.get(key, []):
+                if b <= cursor:
+                    continue
+                if a >= end:
+                    break
+                if a > cursor:
+                    gaps.append((cursor, a))
+                cursor = max(cursor, b)
+
+        if cursor < end:
+            gaps.append((cursor, end))
+
+        return gaps
+
+    def add(self, key, start: int, end: int, data: pd.DataFrame):
+        with self.lock:
+            ranges = sorted(self.ranges.get(key, []) + [(start, end)])
+            merged = [ranges[0]]
+            for a, b in ranges[1:]:
+                if a <= merged[-1][1]:
+                    merged[-1] = (merged[-1][0], max(merged[-1][1], b))
+                else:
+                    merged.append((a, b))
+            self.ranges[key] = merged
+
+            if data is not None:
+                data = self.window(data, start, end)
+                if data['Volume'].notna().all():
+                    data = data.astype({'Volume': 'int64'})
+
+            if data is not None and not data.empty:
+                if key in self.data:
+                    data = pd.concat([self.data[key], data], sort=False)
+                    data = data.loc[~data.index.duplicated(keep='last')].sort_index()
+                self.data[key] = data
+
+    def slice(self, key, start: int, end: int):
+        """
+        Returns the stored data of key in [start, end) (without the 'Epoch' column), or None if nothing is stored.
+        """
+        with self.lock:
+            data = self.data.get(key)
+
+        if data is None:
+            return None
+
+        return self.window(data, start, end).drop(columns='Epoch', errors='ignore')
+
+    @staticmethod
+    def window(data: pd.DataFrame, start: int, end: int):
+        if 'Epoch' in data.columns:
+            epochs = data['Epoch'].values
+        else:
+            epochs = data.index.values.astype('datetime64[s]').astype(np.int64)
+        return data.loc[(epochs >= start) & (epochs < end)]
+
+    def drop(self, key=None):
+        with self.lock:
+            if key is None:
+                self.data = {}
+                self.ranges = {}
+            else:
+                self.data.pop(key, None)
+                self.ranges.pop(key, None)
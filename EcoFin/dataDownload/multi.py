@@ -0,0 +1,71 @@
+"""
+multi.py
+
+Created by Luca Camerani at 18/10/2026, University of Milano-Bicocca.
+(l.camerani@campus.unimib.it)
+All rights reserved.
+
+This file is part of the EcoFin-Library (https://github.com/LucaCamerani/EcoFin-Library),
+and is released under the "BSD Open Source License".
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from EcoFin.dataDownload import functions as fc
+from EcoFin.dataDownload import shared
+from EcoFin.dataDownload.ticker import Ticker
+
+
+def download_many(tickers: (str, list), start=None, end=None, interval="1d",
+                  groupBy='column', workers: int = None, **kwargs):
+    """
+    Download the histories of many tickers concurrently.
+    :Parameters:
+        tickers : str, list
+            List of tickers (or space separated string)
+        start, end : int
+            Download period (unixtimestamp), as in Ticker.getHistory
+        groupBy : str
+            'column' -> columns (field, ticker); 'ticker' -> columns (ticker, field)
+        workers : int
+            Max concurrent downloads. Default is shared.max_workers
+        **kwargs: dict
+            Passed to Ticker.getHistory
+    Returns a DataFrame aligned on dates (MultiIndex columns if more than one ticker).
+    Histories and errors are also stored in shared.DFS and shared.ERRORS.
+    """
+    if isinstance(tickers, str):
+        tickers = tickers.replace(',', ' ').split()
+    tickers = list(dict.fromkeys([ticker.upper() for ticker in tickers]))
+    if workers is None: workers = shared.max_workers
+
+    with ThreadPoolExecutor(max_workers=max(min(workers, len(tickers)), 1)) as executor:
+        futures = {ticker: executor.submit(Ticker(ticker).getHistory, interval=interval,
+                                           start=start, end=end, many=True, **kwargs) for ticker in tickers}
+
+        for ticker, future in futures.items():
+            try:
+                data = future.result()
+                shared.DFS[ticker] = data.loc[~data.index.duplicated(keep='last')]
+            except Exception as e:
+                shared.DFS[ticker] = fc.emptyDataSerie()
+                shared.ERRORS[ticker] = str(e)
+
+    if len(tickers) == 1:
+        return shared.DFS[tickers[0]]
+
+    loaded = [ticker for ticker in tickers if not shared.DFS[ticker].empty]
+    fields = list(dict.fromkeys([field for ticker in loaded for field in shared.DFS[ticker].columns]))
+    if loaded:
+        data = pd.concat([shared.DFS[ticker] for ticker in loaded], axis=1, keys=loaded, sort=True)
+    else:
+        data = pd.DataFrame(index=pd.DatetimeIndex([]), columns=pd.MultiIndex.from_product([[], []]))
+    data.index.name = 'Date'
+
+    if groupBy == 'column':
+        data.columns = data.columns.swaplevel(0, 1)
+        return data.reindex(columns=pd.MultiIndex.from_product([fields, tickers]))
+    else:
+        return data.reindex(columns=pd.MultiIndex.from_product([tickers, fields]))
@@ -9,25 +9,160 @@ This file is part of the EcoFin-Library (https://github.com/LucaCamerani/EcoFin-
 and is released under the "BSD Open Source License".
 """
 
-import requests
+import asyncio
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 
 from EcoFin.dataDownload import shared
-from EcoFin.dataDownload.rates import Rates
+from EcoFin.dataDownload.rates import agetRateCurve, getRateCurve
 from EcoFin.dataDownload.ticker import Ticker
 from EcoFin.options.optionChain import OptionChain
 from EcoFin.options.optionSurface import OptionSurface
+from EcoFin.options.utils import nearestExpiration
+from EcoFin.utils.tradingCalendar import tradingDays
 from EcoFin.utils.utils import *
 
 
+def buildOptionChain(ticker: Ticker, data: dict):
+    """
+    Returns an OptionChain object from parsed chain data (False if data is not available).
+    """
+    if data:
+        return OptionChain(ticker, data, data['now'], data['expirationDate'],
+                           data['underlying']['regularMarketPrice'], data['riskFreeRate'])
+    else:
+        return False
+
+
+class OptionSnapshot():
+    def __init__(self, manager, data: dict):
+        """
+        Option data of a ticker at a given now, built from a single chain download.
+        Chains of further expirations are downloaded once, on first request.
+        """
+        self.manager = manager
+        self.ticker = manager.ticker
+        self.now = data['now']
+        self.quote = data['underlying']
+        self.expirations = sorted(data['expirations'])
+        self.rate = data['riskFreeRate']
+        self.chains = {data['expirationDate']: data}
+        self.default = data['expirationDate']
+
+    def getNow(self):
+        return self.now
+
+    def getQuote(self):
+        return self.quote
+
+    def getSpotPrice(self):
+        return self.quote['regularMarketPrice']
+
+    def getRiskFreeRate(self):
+        return self.rate
+
+    def getExpirations(self):
+        return self.expirations
+
+    def getChainData(self, exp: int = None):
+        """
+        Returns the raw chain data for exp (default: first expiration), or False if not available.
+        """
+        if exp is None: exp = self.default
+
+        if exp not in self.chains:
+            self.chains[exp] = self.manager.downloadOptionChain(exp=exp) or False
+
+        return self.chains[exp]
+
+    def prefetch(self, expirations: list = None, workers: int = None):
+        """
+        Download the chains of expirations (default: all) concurrently, with at most workers requests in flight.
+        """
+        if expirations is None: expirations = self.expirations
+        if workers is None: workers = shared.max_workers
+        missing = [exp for exp in expirations if exp not in self.chains]
+
+        if len(missing) > 0:
+            with ThreadPoolExecutor(max_workers=max(min(workers, len(missing)), 1)) as executor:
+                for exp, data in zip(missing, executor.map(self.manager.downloadOptionChain, missing)):
+                    self.chains[exp] = data or False
+
+        return {exp: self.chains[exp] for exp in expirations}
+
+    async def agetChainData(self, exp: int = None):
+        """
+        Async version of getChainData.
+        """
+        if exp is None: exp = self.default
+
+        if exp not in self.chains:
+            self.chains[exp] = await self.manager.adownloadOptionChain(exp=exp) or False
+
+        return self.chains[exp]
+
+    async def aprefetch(self, expirations: list = None):
+        """
+        Async version of prefetch (all missing chains are requested at once).
+        """
+        if expirations is None: expirations = self.expirations
+        await asyncio.gather(*[self.agetChainData(exp) for exp in expirations])
+
+        return {exp: self.chains[exp] for exp in expirations}
+
+    def getOptionChain(self, exp: int = None):
+        """
+        Returns an OptionChain object.
+        Note: if option chain doesn't exists returns False
+        """
+        return buildOptionChain(self.ticker, self.getChainData(exp))
+
+    def getExpirationByMaturity(self, maturity_days: (int, float), method='nearest', now: int = None):
+        """
+        Returns the expiration nearest to now + maturity_days (see getNearestExpiration for methods).
+        """
+        if now is None: now = self.now
+        target = now + maturity_days * 86400
+
+        return self.getNearestExpiration(target, method)
+
+    def getNearestExpiration(self, date: (int, float) = 0, method='nearest'):
+        """
+        Returns the nearest expiration by setting a date. If not specified it returns the first expiration.
+        Methods:
+            * absolute -> absoute nearest;
+            * greater -> >=;
+            * less -> <=.
+        """
+        return nearestExpiration(self.expirations, date, method)
+
+
 class OptionManager():
-    def __init__(self, ticker: Ticker, now: int = None):
+    def __init__(self, ticker: Ticker, now: int = None, load: bool = True):
+        """
+        If load is False the snapshot at now is not downloaded (see acreate).
+        """
         self.baseUrl = shared.baseUrl
+        self.provider = shared.getProvider()
         self.ticker = ticker
         self.ticker_name = ticker.ticker
-        self.setNow(now)
+        self.snapshot = False
+        self.now = now
+        if load:
+            self.setNow(now)
+
+    @classmethod
+    async def acreate(cls, ticker: Ticker, now: int = None):
+        """
+        Async constructor: returns an OptionManager whose snapshot at now is downloaded without blocking.
+        """
+        manager = cls(ticker, now, load=False)
+        await manager.asetNow(now)
+
+        return manager
 
     def checkNow(self):
-        if self.downloadOptionChain():
+        if self.snapshot:
             return True
         else:
             return False
@@ -37,50 +172,68 @@ class OptionManager():
         Note: now and exp in unixtimestamp format!
         """
         try:
-            if exp is None and self.now is None:
-                url = "{}/v7/finance/options/{}".format(
-                    self.baseUrl, self.ticker_name)
-            elif exp is not None and self.now is None:
-                url = "{}/v7/finance/options/{}?date={}".format(
-                    self.baseUrl, self.ticker_name, exp)
-            elif exp is None and self.now is not None:
-                url = "{}/v7/finance/options/{}?now={}".format(
-                    self.baseUrl, self.ticker_name, self.now)
-            else:
-                url = "{}/v7/finance/options/{}?now={}&date={}".format(
-                    self.baseUrl, self.ticker_name, self.now, exp)
-            if shared.show_url: print('Connection request: {}'.format(url))
-
-            rateHistory = Rates().getHistory()
-
-            if shared.use_cache & shared.session_cache.keyExists(url):
-                r = shared.session_cache.read(url)
-            else:
-                r = requests.get(url=url).json()
-                shared.session_cache.add(key=url, var=r)
+            r = self.provider.option_chain(self.ticker_name, self.now, exp)
 
             if r['optionChain']['result']:
-                r['optionChain']['result'][0]['options'][0]['underlying'] = r['optionChain']['result'][0]['quote']
-                r['optionChain']['result'][0]['options'][0]['expirations'] = r['optionChain']['result'][0][
-                    'expirationDates']
+                return self.parseOptionResult(r['optionChain']['result'][0])
+        except:
+            return False
 
-                try:
-                    r['optionChain']['result'][0]['options'][0]['now'] = r['optionChain']['result'][0]['now']
-                except:
-                    r['optionChain']['result'][0]['options'][0]['now'] = datetime.utcnow().timestamp()
+    async def adownloadOptionChain(self, exp: int = None):
+        """
+        Async version of downloadOptionChain.
+        """
+        try:
+            r = await self.provider.aoption_chain(self.ticker_name, self.now, exp)
+
+            if r['optionChain']['result']:
+                await agetRateCurve()
+                return self.parseOptionResult(r['optionChain']['result'][0])
+        except:
+            return False
 
-                rate = rateHistory.iloc[rateHistory.index.get_loc(
-                    unixtimestamp_to_date(r['optionChain']['result'][0]['options'][0]['now']),
-                    method='nearest')]
-                r['optionChain']['result'][0]['options'][0]['riskFreeRate'] = rate
+    @staticmethod
+    def parseOptionResult(result: dict):
+        """
+        Returns the chain data of an optionChain result, completed with underlying, expirations, now and rate.
+        """
+        result['options'][0]['underlying'] = result['quote']
+        result['options'][0]['expirations'] = result['expirationDates']
 
-                return r['optionChain']['result'][0]['options'][0]
+        try:
+            result['options'][0]['now'] = result['now']
         except:
+            result['options'][0]['now'] = datetime.utcnow().timestamp()
+
+        result['options'][0]['riskFreeRate'] = getRateCurve().rate_at(result['options'][0]['now'])
+
+        return result['options'][0]
+
+    def getSnapshot(self):
+        """
+        Returns the OptionSnapshot at now, or False if no data is available.
+        """
+        data = self.downloadOptionChain()
+
+        if data:
+            return OptionSnapshot(self, data)
+        else:
+            return False
+
+    async def agetSnapshot(self):
+        """
+        Async version of getSnapshot.
+        """
+        data = await self.adownloadOptionChain()
+
+        if data:
+            return OptionSnapshot(self, data)
+        else:
             return False
 
     def getNow(self):
         if self.now is None:
-            self.now = self.downloadOptionChain()['now']
+            return self.snapshot.getNow()
 
         return self.now
 
@@ -88,52 +241,87 @@ class OptionManager():
         """
         Returns a list containing expirations at date for ticker.
         If now is none, returns last available data.
+        Note: if no data is available at now returns False
         """
-        exp_list = sorted(self.downloadOptionChain()['expirations'])
+        if not self.checkNow():
+            return False
 
-        return exp_list
+        return self.snapshot.getExpirations()
 
     def getOptionChain(self, exp: int = None):
         """
         Returns an OptionChain object.
         Note: if option chain doesn't exists returns False
         """
-        data = self.downloadOptionChain(exp=exp)
+        if not self.checkNow():
+            return False
 
-        if data != False:
-            exp = data['expirationDate']
-            now = data['now']
-            price = data['underlying']['regularMarketPrice']
-            rf = data['riskFreeRate']
+        return self.snapshot.getOptionChain(exp)
 
-            option_chain = OptionChain(self.ticker, data, now, exp, price, rf)
-        else:
-            option_chain = False
+    async def agetOptionChain(self, exp: int = None):
+        """
+        Async version of getOptionChain (downloads the snapshot first if not loaded).
+        """
+        if not self.checkNow():
+            await self.asetNow(self.now)
+        if not self.checkNow():
+            return False
 
-        return option_chain
+        return buildOptionChain(self.ticker, await self.snapshot.agetChainData(exp))
 
-    def getOptionSurface(self):
+    def getOptionSurface(self, concurrent: bool = True, workers: int = None):
         """
         Returns an oprionSurface object that contains option chains (one for each expiration date) at now date.
+        If concurrent, chains are downloaded in parallel (at most workers at a time, default shared.max_workers).
+        Note: if no data is available at now returns False
         """
+        if not self.checkNow():
+            return False
+
+        if concurrent:
+            self.snapshot.prefetch(workers=workers)
+
         data = {}
         for expiration in self.getExpirations():
             chain = self.getOptionChain(exp=expiration)
-            data[expiration] = chain
+            if chain is not False:
+                data[expiration] = chain
 
-            now = chain.getChainDate()
-            price = chain.getSpotPrice()
-            rf = chain.getRiskFreeRate()
-
-        optionSurface = OptionSurface(self.ticker, data, now, price, rf)
+        optionSurface = OptionSurface(self.ticker, data, self.snapshot.getNow(),
+                                      self.snapshot.getSpotPrice(), self.snapshot.getRiskFreeRate())
 
         return optionSurface
 
+    async def agetOptionSurface(self):
+        """
+        Async version of getOptionSurface (all chains are requested at once).
+        """
+        if not self.checkNow():
+            await self.asetNow(self.now)
+        if not self.checkNow():
+            return False
+
+        await self.snapshot.aprefetch()
+
+        return self.getOptionSurface(concurrent=False)
+
     def setNow(self, now: int = None):
         """
-        Set-up new now date
+        Set-up new now date (downloads the option snapshot at now)
+        """
+        self.now = now
+        self.snapshot = self.getSnapshot()
+        if self.checkNow():
+            return self.now
+        else:
+            return False
+
+    async def asetNow(self, now: int = None):
+        """
+        Async version of setNow.
         """
         self.now = now
+        self.snapshot = await self.agetSnapshot()
         if self.checkNow():
             return self.now
         else:
@@ -146,10 +334,12 @@ class OptionManager():
             * absolute -> absoute nearest;
             * greater -> >=;
             * less -> <=.
+        Note: if no data is available at now returns False
         """
-        target = self.getNow() + maturity_days * 86400
+        if not self.checkNow():
+            return False
 
-        return self.getNearestExpiration(target, method)
+        return self.snapshot.getExpirationByMaturity(maturity_days, method, now=self.getNow())
 
     def getNearestExpiration(self, date: (int, float) = 0, method='nearest'):
         """
@@ -158,15 +348,64 @@ class OptionManager():
             * absolute -> absoute nearest;
             * greater -> >=;
             * less -> <=.
+        Note: if no data is available at now returns False
         """
-        exps = self.getExpirations()
-        date = int(date)
+        if not self.checkNow():
+            return False
 
-        if method is 'nearest':
-            return min(exps, key=lambda x: abs(x - date))
-        elif method is 'greater':
-            return min([i for i in exps if i >= date], key=lambda x: abs(x - date))
-        elif method is 'less':
-            return min([i for i in exps if i <= date], key=lambda x: abs(x - date))
-        else:
-            print('Invalid method: {}'.format(method))
+        return self.snapshot.getNearestExpiration(date, method)
+
+    def getChainHistory(self, start: int, end: int, maturity_rule: tuple = None, step: int = 86400,
+                        workers: int = None):
+        """
+        Iterator of the OptionChain objects from start to end (unixtimestamp), one for each NYSE trading day with data.
+        maturity_rule = (maturity_days, method) selects the expiration (see getExpirationByMaturity).
+        Chains come from the provider bulk access path (Provider.option_chain_range): range endpoint
+        of the local API, snapshot scan, or requests pipelined on at most workers threads.
+        """
+        for result in self.provider.option_chain_range(self.ticker_name, start, end, maturity_rule, step, workers):
+            yield buildOptionChain(self.ticker, self.parseOptionResult(result))
+
+    def getManagerAt(self, now: int, maturity_rules: list = None, surface: bool = False):
+        """
+        Returns a new OptionManager set at now, with the chains selected by maturity_rules = [(maturity_days, method)]
+        (or every chain if surface) already downloaded. Returns False if no data is available.
+        """
+        manager = OptionManager(self.ticker, now)
+        if not manager.checkNow():
+            return False
+
+        if surface:
+            manager.snapshot.prefetch(workers=1)
+        for rule in maturity_rules or []:
+            try:
+                manager.getOptionChain(exp=manager.getExpirationByMaturity(*rule))
+            except ValueError:  # no expiration satisfies the rule
+                pass
+
+        return manager
+
+    def iterDays(self, start: int, end: int, maturity_rules: list = None, surface: bool = False,
+                 lookahead: int = 5, step: int = 86400, workers: int = 1):
+        """
+        Iterator of the OptionManager objects set at each NYSE trading day in range(start, end, step) with data
+        (see getManagerAt; days failing to download are skipped). The next lookahead days are downloaded
+        on background threads (workers) while the caller processes the current one.
+        """
+        def load(now):
+            try:
+                return self.getManagerAt(int(now), maturity_rules, surface)
+            except Exception:
+                return False
+
+        days = iter(tradingDays(start, end, step))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            pending = deque(executor.submit(load, now) for _, now in zip(range(lookahead + 1), days))
+
+            while len(pending) > 0:
+                manager = pending.popleft().result()
+                for now in days:
+                    pending.append(executor.submit(load, now))
+                    break
+                if manager is not False:
+                    yield manager
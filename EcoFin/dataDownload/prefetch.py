@@ -0,0 +1,187 @@
+"""
+prefetch.py
+
+Created by Luca Camerani at 18/10/2026, University of Milano-Bicocca.
+(l.camerani@campus.unimib.it)
+All rights reserved.
+
+This file is part of the EcoFin-Library (https://github.com/LucaCamerani/EcoFin-Library),
+and is released under the "BSD Open Source License".
+
+Cache warm-up: downloads into the persistent cache (shared.setCache) every request of a day-by-day
+backtest over a ticker universe (histories, option snapshots, chains selected by maturity rules, rates),
+so that the compute stage runs offline. Completed tasks, and each (ticker, day) of the histories, are
+appended to a checkpoint file (--resume).
+
+Usage: ecofin-prefetch --tickers Tesi/INDEXs/DJIA.txt --start 20150101 --end 20191231 \
+                       --maturity 20:greater --cache Export/cache.sqlite [--ip http://127.0.0.1:5000/]
+"""
+
+import argparse
+import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from tqdm import tqdm
+
+from EcoFin.dataDownload import shared
+from EcoFin.dataDownload.optionsManager import OptionManager
+from EcoFin.dataDownload.rates import getRateCurve
+from EcoFin.dataDownload.ticker import Ticker
+from EcoFin.utils.tradingCalendar import tradingDays
+from EcoFin.utils.utils import date_to_unixtimestamp
+
+
+def parseDate(date: str):
+    """
+    Returns date (YYYYMMDD or unixtimestamp) as unixtimestamp.
+    """
+    if len(date) == 8:
+        return int(date_to_unixtimestamp(date))
+
+    return int(date)
+
+
+def parseRule(rule: str):
+    """
+    Returns the maturity rule 'days[:method]' as (days, method).
+    """
+    days, _, method = rule.partition(':')
+
+    return float(days), method or 'nearest'
+
+
+def readTickers(path: str):
+    with open(path) as f:
+        return [line.strip().upper() for line in f if line.strip()]
+
+
+def warmHistory(ticker: str, days: list, done=None):
+    """
+    Requests the history of ticker up to each day, as EquityVIX does in a day-by-day loop, and the
+    open-ended history requested by DeepOptionChain (cached for shared.cache_ttl['period2=None']).
+    done(day) is called once the history up to day is downloaded.
+    """
+    ticker = Ticker(ticker)
+    ticker.getHistory(period="1y", interval="1d")
+    for now in days:
+        ticker.getHistory(end=int(now))
+        if done is not None:
+            done(int(now))
+
+    return True
+
+
+def warmChains(ticker: str, now: int, rules: list, surface: bool = False):
+    """
+    Requests the option snapshot of ticker at now and the chains selected by rules (all chains if surface).
+    """
+    return OptionManager(Ticker(ticker), load=False).getManagerAt(now, rules, surface) is not False
+
+
+def getTasks(tickers: list, start: int, end: int, rules: list, surface: bool = False, history: bool = True):
+    """
+    Returns {task id: (function, args)} of the requests needed by a day-by-day backtest.
+    """
+    days = tradingDays(start, end)
+    tasks = {'rates': (getRateCurve, ())}
+    for ticker in tickers:
+        if history:
+            tasks['history {}'.format(ticker)] = (warmHistory, (ticker, days))
+        for now in days:
+            tasks['chains {} {}'.format(ticker, now)] = (warmChains, (ticker, int(now), rules, surface))
+
+    return tasks
+
+
+def prefetch(tickers: list, start: int, end: int, rules: list, surface: bool = False, history: bool = True,
+             workers: int = None, checkpoint: str = None, resume: bool = False, progressBar: bool = True):
+    """
+    Runs the warm-up tasks concurrently (at most workers, default shared.max_workers).
+    Completed tasks are appended to checkpoint, histories as one '<task> <day>' line per day;
+    with resume, tasks and history days already listed there are skipped (the open-ended history,
+    whose cache entry expires, is requested again).
+    Returns the dict of failed tasks {task id: error}.
+    """
+    if workers is None: workers = shared.max_workers
+    tasks = getTasks(tickers, start, end, rules, surface, history)
+
+    done = set()
+    if checkpoint is not None and resume and os.path.exists(checkpoint):
+        with open(checkpoint) as f:
+            done = set(line.rstrip('\n') for line in f)
+
+    errors = {}
+    lock = threading.Lock()
+    log = None if checkpoint is None else open(checkpoint, 'a' if resume else 'w')
+
+    def record(task: str):
+        if log is not None:
+            with lock:
+                log.write('{}\n'.format(task))
+                log.flush()
+
+    pending = {}
+    for task, (function, args) in tasks.items():
+        if function is warmHistory:
+            ticker, days = args
+            days = [now for now in days if '{} {}'.format(task, int(now)) not in done]
+            args = (ticker, days, lambda now, task=task: record('{} {}'.format(task, now)))
+        elif task in done:
+            continue
+        pending[task] = (function, args)
+
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {executor.submit(function, *args): task for task, (function, args) in pending.items()}
+            for future in tqdm(as_completed(futures), total=len(futures), disable=not progressBar):
+                task = futures[future]
+                try:
+                    future.result()
+                except Exception as e:
+                    errors[task] = e
+                    continue
+
+                if pending[task][0] is not warmHistory:
+                    record(task)
+    finally:
+        if log is not None:
+            log.close()
+
+    return errors
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='EcoFin cache warm-up for day-by-day backtests')
+    parser.add_argument('--tickers', required=True, help='file with one ticker per line')
+    parser.add_argument('--start', required=True, help='first date (YYYYMMDD or unixtimestamp)')
+    parser.add_argument('--end', required=True, help='last date, excluded (YYYYMMDD or unixtimestamp)')
+    parser.add_argument('--maturity', action='append', default=[],
+                        help='maturity rule days[:nearest|greater|less], repeatable (default: first expiration)')
+    parser.add_argument('--surface', action='store_true', help='download the chains of every expiration')
+    parser.add_argument('--no-history', dest='history', action='store_false', help='skip ticker histories')
+    parser.add_argument('--cache', required=True, help='persistent cache (SQLite file)')
+    parser.add_argument('--ip', default=None, help='local data API address (local mode)')
+    parser.add_argument('--workers', type=int, default=None, help='concurrent tasks')
+    parser.add_argument('--checkpoint', default=None, help='checkpoint file (default: <cache>.checkpoint)')
+    parser.add_argument('--resume', action='store_true', help='skip the tasks completed in the checkpoint')
+    args = parser.parse_args(argv)
+
+    if args.ip is not None:
+        shared.local_mode = True
+        shared.setIP(args.ip)
+    shared.setCache(args.cache)
+
+    errors = prefetch(readTickers(args.tickers), parseDate(args.start), parseDate(args.end),
+                      [parseRule(rule) for rule in args.maturity], args.surface, args.history, args.workers,
+                      args.checkpoint or '{}.checkpoint'.format(args.cache), args.resume)
+
+    for task, error in errors.items():
+        print('Error with [{}]: {}'.format(task, error), file=sys.stderr)
+
+    return 1 if len(errors) > 0 else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,237 @@
+"""
+providers.py
+
+Created by Luca Camerani at 18/10/2026, University of Milano-Bicocca.
+(l.camerani@campus.unimib.it)
+All rights reserved.
+
+This file is part of the EcoFin-Library (https://github.com/LucaCamerani/EcoFin-Library),
+and is released under the "BSD Open Source License".
+"""
+
+import asyncio
+from abc import ABC, abstractmethod
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from EcoFin.dataDownload import functions as fc
+from EcoFin.dataDownload import shared
+from EcoFin.dataDownload.server import SnapshotStore
+from EcoFin.options.utils import nearestExpiration
+from EcoFin.utils.tradingCalendar import isTradingDay, tradingDays
+
+
+class Provider(ABC):
+    """
+    Data provider interface (see shared.setProvider). Methods return the raw payloads parsed by
+    TickerCore (chart), OptionManager (optionChain) and Rates (FRED observations).
+    """
+
+    @abstractmethod
+    def history(self, ticker: str, start: int = None, end: int = None, proxy: dict = None):
+        """
+        Returns the chart payload of ticker in [start, end) (unixtimestamp), with dividends and splits.
+        """
+
+    @abstractmethod
+    def option_chain(self, ticker: str, now: int = None, exp: int = None):
+        """
+        Returns the optionChain payload of ticker at now (last available if None) for exp (first if None).
+        """
+
+    @abstractmethod
+    def rates(self, code: str = 'DTB3'):
+        """
+        Returns the observations payload of the rate series code.
+        """
+
+    @abstractmethod
+    def quote(self, ticker: str):
+        """
+        Returns the info payload of ticker.
+        """
+
+    def expirations(self, ticker: str, now: int = None):
+        result = self.option_chain(ticker, now)['optionChain']['result']
+
+        return sorted(result[0]['expirationDates']) if result else []
+
+    # Async versions: by default the blocking method runs in the event loop default executor
+    async def run(self, method, *args):
+        return await asyncio.get_running_loop().run_in_executor(None, method, *args)
+
+    async def ahistory(self, ticker: str, start: int = None, end: int = None, proxy: dict = None):
+        return await self.run(self.history, ticker, start, end, proxy)
+
+    async def aoption_chain(self, ticker: str, now: int = None, exp: int = None):
+        return await self.run(self.option_chain, ticker, now, exp)
+
+    async def arates(self, code: str = 'DTB3'):
+        return await self.run(self.rates, code)
+
+    async def aquote(self, ticker: str):
+        return await self.run(self.quote, ticker)
+
+    def history_many(self, tickers: list, start: int = None, end: int = None, workers: int = None):
+        """
+        Returns {ticker: chart payload}, downloaded concurrently (at most workers, default shared.max_workers).
+        """
+        if workers is None: workers = shared.max_workers
+        with ThreadPoolExecutor(max_workers=max(min(workers, len(tickers)), 1)) as executor:
+            return dict(zip(tickers, executor.map(lambda ticker: self.history(ticker, start, end), tickers)))
+
+    def option_chain_at(self, ticker: str, now: int, maturity_rule: tuple = None):
+        """
+        Returns the optionChain result at now for the expiration selected by maturity_rule = (maturity_days, method)
+        (first expiration if None), or None if not available.
+        """
+        try:
+            result = self.option_chain(ticker, now)['optionChain']['result']
+            if maturity_rule is not None and result:
+                exp = nearestExpiration(result[0]['expirationDates'], now + maturity_rule[0] * 86400, maturity_rule[1])
+                if exp != result[0]['options'][0]['expirationDate']:
+                    result = self.option_chain(ticker, now, exp)['optionChain']['result']
+        except Exception:
+            return None
+
+        return result[0] if result else None
+
+    def option_chain_range(self, ticker: str, start: int, end: int, maturity_rule: tuple = None,
+                           step: int = 86400, workers: int = None):
+        """
+        Iterator of the optionChain results of ticker for each NYSE trading day in range(start, end, step)
+        with data (see option_chain_at). Requests are pipelined on at most workers threads.
+        """
+        if workers is None: workers = shared.max_workers
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            pending = deque()
+            for now in tradingDays(start, end, step):
+                pending.append(executor.submit(self.option_chain_at, ticker, int(now), maturity_rule))
+                if len(pending) >= 2 * workers:
+                    result = pending.popleft().result()
+                    if result is not None:
+                        yield result
+
+            while len(pending) > 0:
+                result = pending.popleft().result()
+                if result is not None:
+                    yield result
+
+
+class YahooProvider(Provider):
+    def __init__(self, baseUrl: str = 'https://query1.finance.yahoo.com',
+                 ratesUrl: str = 'https://api.stlouisfed.org/fred/series/observations',
+                 ratesKey: str = 'fe9e3533755ccaa77e92a7d3cb8ef632'):
+        """
+        Yahoo! Finance API (and FRED for rates), through fc.fetchJson (cache, pacing, archive).
+        """
+        self.baseUrl = baseUrl
+        self.ratesUrl = ratesUrl
+        self.ratesKey = ratesKey
+
+    def historyRequest(self, ticker: str, start: int = None, end: int = None):
+        """
+        Returns (url, params, cache key) of a chart request.
+        """
+        params = {"period1": start, "period2": end, "events": "div,splits"}
+        url = "{}/v8/finance/chart/{}".format(self.baseUrl, ticker)
+        key = '{}?{}'.format(url, '&'.join(['{}={}'.format(k, d) for k, d in params.items()]))
+
+        return url, params, key
+
+    def optionChainRequest(self, ticker: str, now: int = None, exp: int = None):
+        url = "{}/v7/finance/options/{}".format(self.baseUrl, ticker)
+        query = [(k, v) for k, v in [('now', now), ('date', exp)] if v is not None]
+        if len(query) > 0:
+            url = '{}?{}'.format(url, '&'.join(['{}={}'.format(k, v) for k, v in query]))
+
+        return url
+
+    def ratesRequest(self, code: str = 'DTB3'):
+        return "{}?series_id={}&api_key={}&file_type=json".format(self.ratesUrl, code, self.ratesKey)
+
+    def history(self, ticker: str, start: int = None, end: int = None, proxy: dict = None):
+        url, params, key = self.historyRequest(ticker, start, end)
+
+        return fc.fetchJson(url, params=params, key=key, proxy=proxy, check=True)
+
+    def option_chain(self, ticker: str, now: int = None, exp: int = None):
+        return fc.fetchJson(self.optionChainRequest(ticker, now, exp))
+
+    def rates(self, code: str = 'DTB3'):
+        return fc.fetchJson(self.ratesRequest(code))
+
+    def quote(self, ticker: str):
+        return fc.fetchJson("{}/quote/{}".format(self.baseUrl, ticker), check=True)
+
+    async def ahistory(self, ticker: str, start: int = None, end: int = None, proxy: dict = None):
+        url, params, key = self.historyRequest(ticker, start, end)
+
+        return await fc.afetchJson(url, params=params, key=key, proxy=proxy, check=True)
+
+    async def aoption_chain(self, ticker: str, now: int = None, exp: int = None):
+        return await fc.afetchJson(self.optionChainRequest(ticker, now, exp))
+
+    async def arates(self, code: str = 'DTB3'):
+        return await fc.afetchJson(self.ratesRequest(code))
+
+    async def aquote(self, ticker: str):
+        return await fc.afetchJson("{}/quote/{}".format(self.baseUrl, ticker), check=True)
+
+
+class LocalProvider(YahooProvider):
+    def __init__(self, ip: str = r'http://127.0.0.1:5000/'):
+        """
+        Local EcoFin data API (see server.py). Option histories use the bulk range endpoint.
+        """
+        super().__init__('{}/API'.format(ip), '{}/API/finance/rates'.format(ip), None)
+
+    def option_chain_range(self, ticker: str, start: int, end: int, maturity_rule: tuple = None,
+                           step: int = 86400, workers: int = None):
+        """
+        Iterator of the optionChain results of ticker for each NYSE trading day with data in [start, end),
+        downloaded shared.batch_days at a time (step and workers are not used).
+        """
+        for a in range(int(start), int(end), shared.batch_days * 86400):
+            url = "{}/v7/finance/options/{}/range?start={}&end={}".format(
+                self.baseUrl, ticker, a, min(a + shared.batch_days * 86400, int(end)))
+            if maturity_rule is not None:
+                url = "{}&maturity={}&method={}".format(url, *maturity_rule)
+
+            for result in fc.fetchJson(url)['optionChain']['result']:
+                if isTradingDay(result['now']):
+                    yield result
+
+
+class SnapshotProvider(Provider):
+    def __init__(self, root: str):
+        """
+        Snapshot files in the local server layout (see server.py), read directly without HTTP.
+        """
+        self.store = SnapshotStore(root)
+
+    def history(self, ticker: str, start: int = None, end: int = None, proxy: dict = None):
+        return self.store.chart(ticker.upper(), start, end)
+
+    def option_chain(self, ticker: str, now: int = None, exp: int = None):
+        return self.store.options(ticker.upper(), now, exp)
+
+    def rates(self, code: str = 'DTB3'):
+        return self.store.rates(code)
+
+    def quote(self, ticker: str):
+        return self.store.quote(ticker.upper())
+
+    def history_many(self, tickers: list, start: int = None, end: int = None, workers: int = None):
+        return {ticker: self.history(ticker, start, end) for ticker in tickers}
+
+    def option_chain_range(self, ticker: str, start: int, end: int, maturity_rule: tuple = None,
+                           step: int = 86400, workers: int = None):
+        """
+        Iterator of the optionChain results of ticker for each NYSE trading day with data in [start, end),
+        from a single scan of the snapshot files (step and workers are not used).
+        """
+        rule = (None, 'nearest') if maturity_rule is None else maturity_rule
+        for result in self.store.optionsRange(ticker.upper(), start, end, *rule)['optionChain']['result']:
+            if isTradingDay(result['now']):
+                yield result
@@ -0,0 +1,231 @@
+"""
+rateLimiter.py
+
+Created by Luca Camerani at 18/10/2026, University of Milano-Bicocca.
+(l.camerani@campus.unimib.it)
+All rights reserved.
+
+This file is part of the EcoFin-Library (https://github.com/LucaCamerani/EcoFin-Library),
+and is released under the "BSD Open Source License".
+"""
+
+import asyncio
+import sqlite3
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from urllib.parse import urlparse
+
+
+class TokenBucket():
+    def __init__(self, rate: float, burst: float = 1, path: str = None, name: str = 'default'):
+        """
+        Token bucket refilled at rate tokens/second up to burst tokens.
+        If path is given, the bucket state is kept in a SQLite file and shared across processes.
+        """
+        self.rate = rate
+        self.burst = max(burst, 1)
+        self.name = name
+        self.path = path
+        self.lock = threading.Lock()
+        self.tokens = self.burst
+        self.updated = time.monotonic()
+
+        if path is not None:
+            with sqlite3.connect(path, timeout=60) as db:
+                db.execute('CREATE TABLE IF NOT EXISTS buckets (name TEXT PRIMARY KEY, tokens REAL, updated REAL)')
+                db.execute('INSERT OR IGNORE INTO buckets VALUES (?, ?, ?)', (name, self.burst, time.time()))
+
+    def take(self):
+        """
+        Take a token if available. Returns the seconds to wait before retrying (0 if taken).
+        """
+        if self.path is None:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return 0
+                return (1 - self.tokens) / self.rate
+
+        with self.lock:
+            db = sqlite3.connect(self.path, timeout=60, isolation_level=None)
+            try:
+                db.execute('BEGIN IMMEDIATE')
+                tokens, updated = db.execute('SELECT tokens, updated FROM buckets WHERE name = ?',
+                                             (self.name,)).fetchone()
+                now = time.time()
+                tokens = min(self.burst, tokens + max(now - updated, 0) * self.rate)
+                wait = 0 if tokens >= 1 else (1 - tokens) / self.rate
+                if wait == 0:
+                    tokens -= 1
+                db.execute('UPDATE buckets SET tokens = ?, updated = ? WHERE name = ?', (tokens, now, self.name))
+                db.execute('COMMIT')
+            finally:
+                db.close()
+
+            return wait
+
+    def acquire(self):
+        wait = self.take()
+        while wait > 0:
+            time.sleep(wait)
+            wait = self.take()
+
+    async def aacquire(self):
+        """
+        Async version of acquire. A shared (SQLite) bucket is updated in the default executor.
+        """
+        wait = await self.atake()
+        while wait > 0:
+            await asyncio.sleep(wait)
+            wait = await self.atake()
+
+    async def atake(self):
+        if self.path is None:
+            return self.take()
+
+        return await asyncio.get_running_loop().run_in_executor(None, self.take)
+
+
+class AdaptiveConcurrency():
+    def __init__(self, initial: float = 4, minimum: float = 1, maximum: float = 32,
+                 increase: float = 1, decrease: float = .5):
+        """
+        AIMD concurrency limit: +increase per window of successful requests, *decrease on failure.
+        """
+        self.limit = initial
+        self.minimum = minimum
+        self.maximum = maximum
+        self.increase = increase
+        self.decrease = decrease
+        self.running = 0
+        self.condition = threading.Condition()
+        self.waiters = []
+
+    def acquire(self):
+        with self.condition:
+            while self.running >= int(self.limit):
+                self.condition.wait()
+            self.running += 1
+
+    def tryAcquire(self):
+        with self.condition:
+            if self.running >= int(self.limit):
+                return False
+            self.running += 1
+
+            return True
+
+    async def aacquire(self):
+        """
+        Async version of acquire: waits on an asyncio.Event set by release, without blocking the event loop.
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            with self.condition:
+                if self.running < int(self.limit):
+                    self.running += 1
+                    return
+                waiter = (loop, asyncio.Event())
+                self.waiters.append(waiter)
+            try:
+                await waiter[1].wait()
+            finally:
+                with self.condition:
+                    if waiter in self.waiters:
+                        self.waiters.remove(waiter)
+
+    def release(self, success: bool = True):
+        with self.condition:
+            self.running -= 1
+            if success:
+                self.limit = min(self.maximum, self.limit + self.increase / self.limit)
+            else:
+                self.limit = max(self.minimum, self.limit * self.decrease)
+            self.condition.notify_all()
+            waiters, self.waiters = self.waiters, []
+
+        for loop, event in waiters:
+            try:
+                loop.call_soon_threadsafe(event.set)
+            except RuntimeError:  # loop closed
+                pass
+
+
+class RateLimiter():
+    def __init__(self, limits: dict = None, default: tuple = (None, None), path: str = None,
+                 concurrency: dict = None):
+        """
+        Per-host request pacing.
+        :Parameters:
+            limits : dict
+                {host: (requests/second, burst)}; rate None means no pacing
+            default : tuple
+                (requests/second, burst) for hosts not in limits
+            path : str
+                Optional SQLite file to share token buckets across processes
+            concurrency : dict
+                AdaptiveConcurrency arguments (initial, minimum, maximum, increase, decrease)
+        """
+        self.limits = limits or {}
+        self.default = default
+        self.path = path
+        self.concurrency = concurrency or {}
+        self.hosts = {}
+        self.lock = threading.Lock()
+
+    def getHost(self, host: str):
+        with self.lock:
+            if host not in self.hosts:
+                rate, burst = self.limits.get(host, self.default)
+                bucket = None if rate is None else TokenBucket(rate, burst or 1, self.path, host)
+                self.hosts[host] = (bucket, AdaptiveConcurrency(**self.concurrency))
+
+        return self.hosts[host]
+
+    @contextmanager
+    def request(self, url: str):
+        """
+        Context manager wrapping a request to url. Failures (exceptions, or report(False)) shrink
+        the host concurrency limit, successes grow it.
+        """
+        bucket, concurrency = self.getHost(urlparse(url).netloc)
+        outcome = {'success': True}
+
+        concurrency.acquire()
+        try:
+            if bucket is not None:
+                bucket.acquire()
+            yield lambda success: outcome.update(success=success)
+        except Exception:
+            outcome['success'] = False
+            raise
+        finally:
+            concurrency.release(outcome['success'])
+
+    @asynccontextmanager
+    async def arequest(self, url: str):
+        """
+        Async version of request: waits for the host slot and token without blocking the event loop.
+        """
+        bucket, concurrency = self.getHost(urlparse(url).netloc)
+        outcome = {'success': True}
+
+        await concurrency.aacquire()
+        try:
+            if bucket is not None:
+                await bucket.aacquire()
+            yield lambda success: outcome.update(success=success)
+        except Exception:
+            outcome['success'] = False
+            raise
+        finally:
+            concurrency.release(outcome['success'])
+
+    def getStatus(self):
+        with self.lock:
+            return {host: {'limit': concurrency.limit, 'running': concurrency.running}
+                    for host, (bucket, concurrency) in self.hosts.items()}
@@ -9,8 +9,7 @@ This file is part of the EcoFin-Library (https://github.com/LucaCamerani/EcoFin-
 and is released under the "BSD Open Source License".
 """
 
-import json
-import urllib.request
+import threading
 
 import numpy as np
 import pandas as pd
@@ -20,21 +19,16 @@ from EcoFin.dataDownload import shared
 
 class Rates():
     def __init__(self):
-        self.url = shared.ratesUrl
-        self.key = shared.ratesKEY
+        self.provider = shared.getProvider()
 
     def download_series(self, ticker: str):
-        url = "{}?series_id={}&api_key={}&file_type=json".format(self.url, ticker, self.key)
+        return self.parseSeries(self.provider.rates(ticker))
 
-        if shared.show_url: print('Connection request: {}'.format(url))
-
-        if shared.use_cache & shared.session_cache.keyExists(url):
-            data = shared.session_cache.read(url)
-        else:
-            with urllib.request.urlopen(url) as urll:
-                data = json.loads(urll.read().decode())
-            shared.session_cache.add(key=url, var=data)
+    async def adownload_series(self, ticker: str):
+        return self.parseSeries(await self.provider.arates(ticker))
 
+    @staticmethod
+    def parseSeries(data: dict):
         series = pd.DataFrame(data['observations']).set_index('date')['value']
 
         try:
@@ -50,7 +44,68 @@ class Rates():
 
     def getHistory(self, code="DTB3"):
         # DGS3MO <-- LIBOR
-        data = self.download_series('DTB3')
+        data = self.download_series(code)
+        output = (data / float(100)).interpolate()
+
+        return output
+
+    async def agetHistory(self, code="DTB3"):
+        data = await self.adownload_series(code)
         output = (data / float(100)).interpolate()
 
         return output
+
+
+class RateCurve():
+    def __init__(self, series: pd.Series):
+        """
+        Rate history as sorted numpy arrays, queried by nearest observation date.
+        """
+        series = series.dropna().sort_index()
+        self.dates = series.index.values.astype('datetime64[s]').astype(np.int64)
+        self.rates = series.values.astype(float)
+
+    def rates_at(self, ts):
+        """
+        Vectorized lookup: rates at the observation dates nearest to ts (unix timestamps, UTC days).
+        """
+        ts = np.asarray(ts, dtype=np.int64)
+        ts = ts - ts % 86400
+
+        right = np.searchsorted(self.dates, ts).clip(0, len(self.dates) - 1)
+        left = (right - 1).clip(0)
+        idx = np.where(ts - self.dates[left] < self.dates[right] - ts, left, right)
+
+        return self.rates[idx]
+
+    def rate_at(self, ts: (int, float)):
+        return float(self.rates_at([ts])[0])
+
+
+_curves = {}
+_curves_lock = threading.Lock()
+
+
+def getRateCurve(code="DTB3"):
+    """
+    Returns the process-wide RateCurve for code, downloading and parsing it on first use.
+    """
+    key = (shared.getProvider(), code)
+    with _curves_lock:
+        if key not in _curves:
+            _curves[key] = RateCurve(Rates().getHistory(code))
+
+    return _curves[key]
+
+
+async def agetRateCurve(code="DTB3"):
+    """
+    Async version of getRateCurve.
+    """
+    key = (shared.getProvider(), code)
+    if key not in _curves:
+        curve = RateCurve(await Rates().agetHistory(code))
+        with _curves_lock:
+            _curves.setdefault(key, curve)
+
+    return _curves[key]
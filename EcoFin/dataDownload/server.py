@@ -0,0 +1,294 @@
+"""
+server.py
+
+Created by Luca Camerani at 18/10/2026, University of Milano-Bicocca.
+(l.camerani@campus.unimib.it)
+All rights reserved.
+
+This file is part of the EcoFin-Library (https://github.com/LucaCamerani/EcoFin-Library),
+and is released under the "BSD Open Source License".
+
+Local stand-in for the EcoFin data API (shared.local_mode / shared.setIP), serving stored snapshots:
+    <root>/chart/<TICKER>.json          chart payload (v8/finance/chart), sliced by period1/period2
+    <root>/options/<TICKER>/<now>.json  option payload (v7/finance/options) with one chain per expiration
+    <root>/rates/<SERIES>.json          FRED observations payload (finance/rates?series_id=)
+    <root>/quote/<TICKER>.json          ticker info (quote/<TICKER>)
+Batch endpoints:
+    GET /API/v7/finance/options/<TICKER>/range?start=&end=[&maturity=&method=] returns one chain per snapshot
+    POST /API/batch with a JSON list of relative URLs returns the list of {"status": ..., "payload": ...}.
+Invalid queries are answered with status 400 and a JSON error.
+
+Usage: python -m EcoFin.dataDownload.server --root <dir> [--host 127.0.0.1] [--port 5000]
+"""
+
+import argparse
+import bisect
+import json
+import os
+import threading
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+
+from EcoFin.options.utils import nearestExpiration
+
+
+class SnapshotStore():
+    def __init__(self, root: str, maxsize: int = 1024):
+        """
+        Snapshot files under root. The text of the last maxsize files read is kept in memory;
+        each load parses it again, so callers get their own copy of the payload.
+        """
+        self.root = root
+        self.maxsize = maxsize
+        self.lock = threading.Lock()
+        self.nows = {}
+        self.files = OrderedDict()
+
+    def getPath(self, *parts):
+        return os.path.join(self.root, *[str(part) for part in parts])
+
+    def load(self, path: str):
+        with self.lock:
+            text = self.files.get(path)
+            if text is not None:
+                self.files.move_to_end(path)
+
+        if text is None:
+            with open(path) as f:
+                text = f.read()
+            with self.lock:
+                self.files[path] = text
+                while len(self.files) > self.maxsize:
+                    self.files.popitem(last=False)
+
+        return json.loads(text)
+
+    def save(self, payload: dict, *parts):
+        path = self.getPath(*parts)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w') as f:
+            json.dump(payload, f)
+
+        with self.lock:
+            self.nows = {}
+            self.files.pop(path, None)
+
+    def saveChart(self, ticker: str, payload: dict):
+        self.save(payload, 'chart', '{}.json'.format(ticker.upper()))
+
+    def saveOptions(self, ticker: str, payload: dict):
+        """
+        payload: v7/finance/options payload whose result holds the chains of every expiration.
+        """
+        now = int(payload['optionChain']['result'][0]['now'])
+        self.save(payload, 'options', ticker.upper(), '{}.json'.format(now))
+
+    def saveRates(self, series: str, payload: dict):
+        self.save(payload, 'rates', '{}.json'.format(series))
+
+    def saveQuote(self, ticker: str, payload: dict):
+        self.save(payload, 'quote', '{}.json'.format(ticker.upper()))
+
+    def getNows(self, ticker: str):
+        """
+        Returns the sorted list of snapshot dates (unixtimestamp) available for ticker.
+        """
+        with self.lock:
+            if ticker not in self.nows:
+                try:
+                    files = os.listdir(self.getPath('options', ticker))
+                except FileNotFoundError:
+                    files = []
+                self.nows[ticker] = sorted(int(f[:-5]) for f in files if f.endswith('.json'))
+
+            return self.nows[ticker]
+
+    def chart(self, ticker: str, period1: int = None, period2: int = None):
+        try:
+            data = self.load(self.getPath('chart', '{}.json'.format(ticker)))
+        except FileNotFoundError:
+            return {'chart': {'result': None, 'error': {'code': 'Not Found',
+                                                        'description': 'No data found, symbol may be delisted'}}}
+
+        result = data['chart']['result'][0]
+        lower = -float('inf') if period1 is None else period1
+        upper = float('inf') if period2 is None else period2
+        keep = [i for i, ts in enumerate(result['timestamp']) if lower <= ts < upper]
+
+        def take(values):
+            return [values[i] for i in keep]
+
+        indicators = {'quote': [{k: take(v) for k, v in result['indicators']['quote'][0].items()}]}
+        if 'adjclose' in result['indicators']:
+            indicators['adjclose'] = [{'adjclose': take(result['indicators']['adjclose'][0]['adjclose'])}]
+        sliced = {'meta': result['meta'], 'timestamp': take(result['timestamp']), 'indicators': indicators}
+        if 'events' in result:
+            sliced['events'] = {kind: {k: e for k, e in events.items() if lower <= e['date'] < upper}
+                                for kind, events in result['events'].items()}
+
+        return {'chart': {'result': [sliced], 'error': None}}
+
+    def getSnapshot(self, ticker: str, now: int = None):
+        """
+        Returns the latest snapshot of ticker on the UTC day of now (latest overall if now is None), or None.
+        """
+        nows = self.getNows(ticker)
+        if now is None:
+            found = nows[-1] if len(nows) > 0 else None
+        else:
+            i = bisect.bisect_left(nows, now - now % 86400 + 86400)
+            found = nows[i - 1] if i > 0 and nows[i - 1] >= now - now % 86400 else None
+
+        if found is None:
+            return None
+
+        return self.load(self.getPath('options', ticker, '{}.json'.format(found)))
+
+    def options(self, ticker: str, now: int = None, date: int = None):
+        data = self.getSnapshot(ticker, now)
+        if data is None or not data['optionChain']['result']:
+            return {'optionChain': {'result': [], 'error': None}}
+
+        result = data['optionChain']['result'][0]
+        chains = {chain['expirationDate']: chain for chain in result['options']}
+        if date is None:
+            date = min(chains.keys())
+        if date not in chains:
+            return {'optionChain': {'result': [], 'error': None}}
+
+        snapshot = {k: v for k, v in result.items() if k != 'options'}
+        snapshot['options'] = [dict(chains[date])]
+
+        return {'optionChain': {'result': [snapshot], 'error': None}}
+
+    def optionsRange(self, ticker: str, start: int, end: int, maturity: float = None, method: str = 'nearest'):
+        """
+        Returns the chains of every snapshot in [start, end), one per snapshot, with the expiration
+        selected by maturity (days from the snapshot date, see nearestExpiration; first expiration if None).
+        """
+        results = []
+        nows = self.getNows(ticker)
+        for now in nows[bisect.bisect_left(nows, start):bisect.bisect_left(nows, end)]:
+            result = self.load(self.getPath('options', ticker, '{}.json'.format(now)))['optionChain']['result']
+            if not result:
+                continue
+
+            chains = {chain['expirationDate']: chain for chain in result[0]['options']}
+            try:
+                if maturity is None:
+                    date = min(chains.keys())
+                else:
+                    date = nearestExpiration(list(chains.keys()), result[0]['now'] + maturity * 86400, method)
+            except ValueError:
+                continue
+
+            snapshot = {k: v for k, v in result[0].items() if k != 'options'}
+            snapshot['options'] = [dict(chains[date])]
+            results.append(snapshot)
+
+        return {'optionChain': {'result': results, 'error': None}}
+
+    def rates(self, series: str):
+        return self.load(self.getPath('rates', '{}.json'.format(series)))
+
+    def quote(self, ticker: str):
+        return self.load(self.getPath('quote', '{}.json'.format(ticker)))
+
+    def dispatch(self, url: str):
+        """
+        Returns (status, payload) for a relative API url.
+        """
+        def number(name):
+            value = query.get(name)
+            return None if value in [None, 'None', ''] else int(float(value))
+
+        try:
+            parts = urlsplit(url)
+            path = [p for p in parts.path.split('/') if p]
+            query = {k: v[-1] for k, v in parse_qs(parts.query).items()}
+            if len(path) > 0 and path[0] == 'API':
+                path = path[1:]
+
+            if path[:3] == ['v8', 'finance', 'chart'] and len(path) == 4:
+                return 200, self.chart(path[3].upper(), number('period1'), number('period2'))
+            elif path[:3] == ['v7', 'finance', 'options'] and len(path) == 4:
+                return 200, self.options(path[3].upper(), number('now'), number('date'))
+            elif path[:3] == ['v7', 'finance', 'options'] and len(path) == 5 and path[4] == 'range':
+                maturity = query.get('maturity')
+                return 200, self.optionsRange(path[3].upper(), number('start'), number('end'),
+                                              None if maturity is None else float(maturity),
+                                              query.get('method', 'nearest'))
+            elif path == ['finance', 'rates']:
+                return 200, self.rates(query.get('series_id', 'DTB3'))
+            elif path[:1] == ['quote'] and len(path) == 2:
+                return 200, self.quote(path[1].upper())
+        except FileNotFoundError:
+            return 404, {'error': 'Snapshot not found: {}'.format(url)}
+        except (ValueError, KeyError, TypeError) as e:
+            return 400, {'error': 'Invalid request {}: {}'.format(url, e)}
+
+        return 404, {'error': 'Unknown endpoint: {}'.format(url)}
+
+
+class RequestHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # keep-alive
+    store = None
+
+    def reply(self, status: int, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        self.reply(*self.store.dispatch(self.path))
+
+    def do_POST(self):
+        if urlsplit(self.path).path.rstrip('/') not in ['/API/batch', '/batch']:
+            return self.reply(404, {'error': 'Unknown endpoint: {}'.format(self.path)})
+
+        try:
+            urls = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))))
+            if not isinstance(urls, list) or not all(isinstance(url, str) for url in urls):
+                raise ValueError('expected a list of URLs')
+        except ValueError as e:
+            return self.reply(400, {'error': 'Invalid batch request: {}'.format(e)})
+
+        replies = [self.store.dispatch(url) for url in urls]
+        self.reply(200, [{'status': status, 'payload': payload} for status, payload in replies])
+
+    def log_message(self, format, *args):
+        pass
+
+
+def makeServer(root: str, host: str = '127.0.0.1', port: int = 5000):
+    """
+    Returns a (not yet started) threaded HTTP server serving the snapshots in root.
+    """
+    handler = type('Handler', (RequestHandler,), {'store': SnapshotStore(root)})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+
+    return server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='EcoFin local data API server')
+    parser.add_argument('--root', required=True, help='snapshots directory')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=5000)
+    args = parser.parse_args(argv)
+
+    server = makeServer(args.root, args.host, args.port)
+    print('Serving {} on http://{}:{}/API'.format(args.root, args.host, args.port))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
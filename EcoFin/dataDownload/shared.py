@@ -9,13 +9,23 @@ This file is part of the EcoFin-Library (https://github.com/LucaCamerani/EcoFin-
 and is released under the "BSD Open Source License".
 """
 
-from EcoFin.dataDownload.cache import Cache
+import os
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from EcoFin.dataDownload.archive import Archive
+from EcoFin.dataDownload.cache import Cache, DiskCache
+from EcoFin.dataDownload.historyStore import HistoryStore
+from EcoFin.dataDownload.rateLimiter import RateLimiter
 
 ip = r'http://127.0.0.1:5000/'  # (LOCAL)
 
 
 def resetUrl():
-    global baseUrl, ratesUrl, ratesKEY, poolUrl, ip
+    global baseUrl, ratesUrl, ratesKEY, poolUrl, ip, provider
     if local_mode is False:
         baseUrl = 'https://query1.finance.yahoo.com'
         ratesUrl = 'https://api.stlouisfed.org/fred/series/observations'
@@ -24,6 +34,7 @@ def resetUrl():
         baseUrl = '{}/API'.format(ip)
         ratesUrl = '{}/API/finance/rates'.format(ip)
         ratesKEY = None
+    provider = None  # rebuilt by getProvider
 
     poolUrl = '{}/pool'.format(ip)
 
@@ -34,12 +45,46 @@ ERRORS = {}
 
 use_cache = True
 
+# Time-to-live (seconds) of persistent cache entries, by key pattern
+cache_ttl = {r'period2=None': 86400,  # open-ended histories
+             r'/options/[^?]*(\?date=\d+)?$': 3600,  # live option chains
+             r'finance/rates|series_id=': 86400,
+             r'/quote/': 604800}
+
 if "session_cache" not in locals():
     session_cache = Cache()
 
+# Incremental history downloads
+use_history_store = True
+history_ttl = 3600  # seconds before open-ended histories are refreshed
+history_lookahead = 365 * 86400  # seconds downloaded beyond the requested end
+
+if "history_store" not in locals():
+    history_store = HistoryStore()
+
 local_mode = False
 show_url = False
 
+# Record/replay archive of HTTP responses (see setArchive)
+if "archive" not in locals():
+    archive = None
+
+# HTTP connection pool
+pool_size = 16  # max keep-alive connections per host
+retries = 3  # retries on connection errors and on retry_statuses responses
+retry_statuses = [429, 500, 502, 503, 504]  # retried by functions.download (one rate limiter token per attempt)
+backoff = 0.5  # exponential backoff factor (seconds)
+timeout = 30  # seconds
+max_workers = 8  # concurrent downloads
+batch_days = 90  # days of option chains per range request (local mode)
+
+# Request pacing: {host: (requests/second, burst)}, AIMD concurrency for every host
+rate_limits = {'query1.finance.yahoo.com': (5, 10),
+               'api.stlouisfed.org': (2, 5)}
+
+if "rate_limiter" not in locals():
+    rate_limiter = RateLimiter(rate_limits)
+
 resetUrl()
 
 
@@ -48,3 +93,99 @@ def setIP(IP):
     ip = IP
 
     resetUrl()
+
+
+def setCache(path: str = None, bytelimit: int = 2 ** 30, ttl: dict = None):
+    """
+    Switch session_cache to a persistent on-disk store (or back to memory if path is None).
+    """
+    global session_cache
+    if path is None:
+        session_cache = Cache()
+    else:
+        session_cache = DiskCache(path, bytelimit=bytelimit, ttl=cache_ttl if ttl is None else ttl)
+
+    return session_cache
+
+
+_session = None
+_session_pid = None
+_session_lock = threading.Lock()
+
+
+def getSession():
+    """
+    Returns the process-wide pooled HTTP session (rebuilt after a fork).
+    The adapter only retries connection errors: status retries go through the rate limiter (see functions.download).
+    """
+    global _session, _session_pid
+    with _session_lock:
+        if _session is None or _session_pid != os.getpid():
+            retry = Retry(total=retries, backoff_factor=backoff, status=0, respect_retry_after_header=False,
+                          raise_on_status=False)
+            adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+
+            _session = requests.Session()
+            _session.mount('http://', adapter)
+            _session.mount('https://', adapter)
+            _session_pid = os.getpid()
+
+    return _session
+
+
+def resetSession():
+    """
+    Drop the current session so that the next request applies new pool settings.
+    """
+    global _session
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+        _session = None
+
+
+def setRateLimiter(limits: dict = None, default: tuple = (None, None), path: str = None, **concurrency):
+    """
+    Replace shared.rate_limiter. If path is given, token buckets are shared by all processes using it.
+    Keyword arguments set the AIMD concurrency (initial, minimum, maximum, increase, decrease).
+    """
+    global rate_limiter
+    rate_limiter = RateLimiter(rate_limits if limits is None else limits, default, path, concurrency)
+
+    return rate_limiter
+
+
+def setArchive(path: str = None, mode: str = 'replay'):
+    """
+    Record every HTTP response to the archive at path (mode='record'), or serve requests only
+    from it without any network access (mode='replay'). path None disables the archive.
+    """
+    global archive
+    archive = None if path is None else Archive(path, mode)
+
+    return archive
+
+
+def getProvider():
+    """
+    Returns the data provider (see providers.py): the Yahoo! API, or the local API in local_mode,
+    unless replaced by setProvider.
+    """
+    global provider
+    if provider is None:
+        from EcoFin.dataDownload.providers import LocalProvider, YahooProvider  # avoids a circular import
+
+        provider = LocalProvider(ip) if local_mode else YahooProvider(baseUrl, ratesUrl, ratesKEY)
+
+    return provider
+
+
+def setProvider(source):
+    """
+    Replace the data provider, e.g. setProvider(SnapshotProvider(root)).
+    Note: setIP and resetUrl switch back to the Yahoo!/local API provider.
+    """
+    global provider
+    provider = source
+
+    return provider
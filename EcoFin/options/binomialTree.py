@@ -32,10 +32,7 @@ class BinomialTree():
     def getUnderlyingAtTime(self, step=None):
         if step is None: step = self.N
 
-        prices = []
-        for i in range(0, step + 1):
-            prices.append(self.S * self.u ** i * self.d ** (step - i))
-        return np.array(prices)
+        return self.S * self.u ** (2 * np.arange(step + 1) - step)
 
     def getRiskNeutralProb(self):
         return (np.exp(self.r * self.deltaT) - self.d) / float(self.u - self.d)
@@ -53,11 +50,9 @@ class BinomialTree():
     def getPayoffAtTime(self, step=None):
         if step is None: step = self.N
 
-        callPayoff = self.getUnderlyingAtTime(step=step) - self.K
-        callPayoff[callPayoff < 0] = 0
-
-        putPayoff = self.K - self.getUnderlyingAtTime(step=step)
-        putPayoff[putPayoff < 0] = 0
+        underlying = self.getUnderlyingAtTime(step=step)
+        callPayoff = np.maximum(underlying - self.K, 0)
+        putPayoff = np.maximum(self.K - underlying, 0)
 
         return namedtuple('Payoff', ['call', 'put'])(**{
             "call": callPayoff,
@@ -80,7 +75,7 @@ class BinomialTree():
             "put": output['put'][::-1]
         })
 
-    def computePrice(self):
+    def computePrice(self, tree=True):
         if self.plainVanilla:
             callPrice = np.exp(-self.r * self.T) * np.array(self.getPayoffAtTime().call).dot(
                 self.getProbabilitiesAtTime())
@@ -88,7 +83,7 @@ class BinomialTree():
                 self.getProbabilitiesAtTime())
             tree = None
         else:
-            prices = self.computeAmericanPrice()
+            prices = self.computeAmericanPrice(tree=tree)
             callPrice = prices.call
             putPrice = prices.put
             tree = prices.tree
@@ -102,39 +97,41 @@ class BinomialTree():
     def putCallParity(self, callPrice):
         return callPrice - self.S + self.K * np.exp(-self.r * self.T)
 
-    def computeAmericanPrice(self):
-        output = {}
-        tree = {'call': [{}] * self.N, 'put': [{}] * self.N}
-        for type in ['call', 'put']:
-            if type == 'call':
-                payoff = self.getPayoffAtTime().call
-            else:
-                payoff = self.getPayoffAtTime().put
-
-            for step in self.getTimeVector()[::-1]:
-                price = []
-                for node in range(0, len(payoff) - 1, 1):
-                    up = payoff[node + 1]
-                    down = payoff[node]
-                    price.append(np.exp(-self.r * self.deltaT) * (self.q * up + (1 - self.q) * down))
-
-                if type == 'call':
-                    backward = self.getPayoffAtTime(step=step).call
-                else:
-                    backward = self.getPayoffAtTime(step=step).put
-
-                payoff = np.maximum(backward, price)
-                tree[type][step] = {'udl': self.getUnderlyingAtTime(step=step),
-                                    'pay': backward,
-                                    'opt': np.array(price)}
-
-            tree[type] = pd.DataFrame.from_dict(tree[type])
-            output[type] = payoff[0]
+    def computeAmericanPrice(self, tree=True):
+        """
+        Backward induction of call and put values on preallocated arrays (row 0 call, row 1 put), overwritten
+        in place at every step; node prices are S * u^(2i - step). The per-step tree is only built if tree is True.
+        """
+        discount = np.exp(-self.r * self.deltaT)
+        up, down = discount * self.q, discount * (1 - self.q)
+        powers = self.u ** np.arange(-self.N, self.N + 1)
+        sign = np.array([[1.], [-1.]])
+
+        values, scratch = np.empty((2, self.N + 1)), np.empty((2, self.N + 1))
+        spot = self.S * powers[::2]
+        np.maximum(sign * (spot - self.K), 0, out=values)
+
+        nodes = {'call': [{}] * self.N, 'put': [{}] * self.N}
+        for step in self.getTimeVector()[::-1]:
+            n = step + 1
+            spot = self.S * powers[self.N - step:self.N + step + 1:2]
+            exercise = np.maximum(sign * (spot - self.K), 0)
+
+            np.multiply(values[:, 1:n + 1], up, out=scratch[:, :n])
+            values[:, :n] *= down
+            values[:, :n] += scratch[:, :n]
+            if tree:
+                for i, type in enumerate(['call', 'put']):
+                    nodes[type][step] = {'udl': spot, 'pay': exercise[i], 'opt': values[i, :n].copy()}
+            np.maximum(values[:, :n], exercise, out=values[:, :n])
+
+        if tree:
+            nodes = {type: pd.DataFrame.from_dict(nodes[type]) for type in nodes.keys()}
 
         return namedtuple('Prices', ['call', 'put', 'tree'])(**{
-            "call": output['call'],
-            "put": output['put'],
-            "tree": tree
+            "call": values[0, 0],
+            "put": values[1, 0],
+            "tree": nodes if tree else None
         })
 
     def getTimeVector(self):
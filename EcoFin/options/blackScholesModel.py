@@ -12,21 +12,159 @@ and is released under the "BSD Open Source License".
 from collections import namedtuple
 
 import numpy as np
+import pandas as pd
+from scipy.optimize import brentq
 from scipy.special import ndtr
 from scipy.stats import norm
 
-from EcoFin.math.utils import findNearest
+Values = namedtuple('Values', ['d1', 'd2'])
+Prices = namedtuple('Prices', ['call', 'put'])
+Delta = namedtuple('Delta', ['call', 'put'])
+Gamma = namedtuple('Gamma', ['call', 'put'])
+Theta = namedtuple('Theta', ['call', 'put'])
+Vega = namedtuple('Vega', ['call', 'put'])
+Rho = namedtuple('Rho', ['call', 'put'])
+Omega = namedtuple('Omega', ['call', 'put'])
+Distribution = namedtuple('Distruibution', ['strike', 'probability'])
+
+
+def floorSigma(sigma):
+    """
+    Replace null volatilities with 1.0e-5 (scalars stay scalars).
+    """
+    return np.where(np.asarray(sigma) == 0, 1.0e-5, sigma)[()]
+
+
+def blackPrice(F, K, T, sigma, theta):
+    """
+    Undiscounted Black price and vega (theta = 1 call, -1 put).
+    """
+    sigmaT = sigma * np.sqrt(T)
+    d1 = np.log(F / K) / sigmaT + sigmaT / 2
+    d2 = d1 - sigmaT
+
+    return theta * (F * ndtr(theta * d1) - K * ndtr(theta * d2)), F * norm._pdf(d1) * np.sqrt(T)
+
+
+def solveImpliedVolatility(price, S, K, T, r=0, div=0, type='call', tol=1.0e-8, maxIter=100):
+    """
+    Vectorized Black-Scholes implied volatility (price, S, K, T in years, r, div and type broadcast together).
+    Each contract is solved on its out-of-the-money side (put-call parity) by Newton steps on vega,
+    safeguarded by a bisection bracket and started from the Corrado-Miller approximation;
+    contracts not converged within maxIter fall back to Brent's method. Converges to tol.
+    Returns NaN for prices outside the no-arbitrage bounds (or null maturity).
+    """
+    price, S, K, T, r, div, isCall = np.broadcast_arrays(*[np.asarray(x, dtype=float) for x in
+                                                            [price, S, K, T, 0 if r is None else r, div]],
+                                                          np.asarray(type) == 'call')
+    shape = price.shape
+    price, S, K, T, r, div, isCall = [np.array(x, ndmin=1).ravel() for x in [price, S, K, T, r, div, isCall]]
+
+    with np.errstate(all='ignore'):
+        # undiscounted prices on the forward, converted to the out-of-the-money option
+        discount = np.exp(-r * T)
+        F = S * np.exp(-div * T) / discount
+        call = np.where(isCall, price / discount, price / discount + F - K)
+        theta = np.where(K >= F, 1., -1.)
+        target = np.where(theta > 0, call, call - (F - K))
+        upper = np.where(theta > 0, F, K)
+        valid = (T > 0) & (target > 0) & (target < upper)
+
+        # initial guess (Corrado-Miller), bracket [lo, hi]
+        mid = call - (F - K) / 2
+        sigma = np.sqrt(2 * np.pi) / (F + K) * (mid + np.sqrt(np.maximum(mid ** 2 - (F - K) ** 2 / np.pi, 0)))
+        sigma = sigma / np.sqrt(T)
+        sigma = np.where(np.isfinite(sigma) & (sigma > 0), sigma, .2)
+        lo, hi = np.zeros_like(sigma), np.full_like(sigma, 10.)
+        for _ in range(16):
+            low = valid & (blackPrice(F, K, T, hi, theta)[0] < target)
+            if not low.any(): break
+            lo[low], hi[low] = hi[low], hi[low] * 4
+        sigma = np.clip(sigma, lo, hi)
+
+        active = valid.copy()
+        for _ in range(maxIter):
+            if not active.any(): break
+            i = np.flatnonzero(active)
+            value, vega = blackPrice(F[i], K[i], T[i], sigma[i], theta[i])
+            diff = value - target[i]
+            hi[i] = np.where(diff > 0, sigma[i], hi[i])
+            lo[i] = np.where(diff > 0, lo[i], sigma[i])
+
+            step = sigma[i] - diff / vega
+            step = np.where(np.isfinite(step) & (step >= lo[i]) & (step <= hi[i]), step, (lo[i] + hi[i]) / 2)
+            step = np.where(diff == 0, sigma[i], step)
+            active[i] = np.abs(step - sigma[i]) > tol
+            sigma[i] = step
+
+        for i in np.flatnonzero(active):
+            try:
+                sigma[i] = brentq(lambda x: blackPrice(F[i], K[i], T[i], x, theta[i])[0] - target[i],
+                                  lo[i], hi[i], xtol=tol)
+            except ValueError:
+                sigma[i] = np.nan
+
+    return np.where(valid, sigma, np.nan).reshape(shape)[()]
+
+
+def greeks(S, K, T, r, sigma, div=0):
+    """
+    Black-Scholes-Merton sensitivities of call and put contracts (S, K, T in years, r, sigma and div
+    broadcast together), sharing d1, d2, densities and discount factors in a single pass.
+    Returns a DataFrame (one row per contract) with <greek>_call and <greek>_put columns:
+        * first order -> delta, vega, theta, rho, epsilon (dividend);
+        * second order -> gamma, vanna, volga, charm, veta.
+    Theta, charm and veta are per year of calendar time.
+    """
+    S, K, T, r, sigma, div = [np.ravel(x) for x in np.broadcast_arrays(*[np.asarray(x, dtype=float) for x in
+                                                                        [S, K, T, 0 if r is None else r, sigma, div]])]
+    sigma = floorSigma(sigma)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        sqrtT = np.sqrt(T)
+        sigmaT = sigma * sqrtT
+        d1 = (np.log(S / K) + (r - div + sigma ** 2 * 0.5) * T) / sigmaT
+        d2 = d1 - sigmaT
+        pdf = norm._pdf(d1)
+        Nd1, Nd2 = ndtr(d1), ndtr(d2)
+        q, d = np.exp(-div * T), np.exp(-r * T)
+        Sq, Kd = S * q, K * d
+
+        gamma = q * pdf / (S * sigmaT)
+        vega = Sq * pdf * sqrtT
+        decay = -Sq * pdf * sigma / (2 * sqrtT)
+        drift = q * pdf * (2 * (r - div) * T - d2 * sigmaT) / (2 * T * sigmaT)
+        veta = vega * (div + (r - div) * d1 / sigmaT - (1 + d1 * d2) / (2 * T))
+
+        values = {'delta': (q * Nd1, q * (Nd1 - 1)),
+                  'vega': (vega, vega),
+                  'theta': (decay - r * Kd * Nd2 + div * Sq * Nd1, decay + r * Kd * (1 - Nd2) - div * Sq * (1 - Nd1)),
+                  'rho': (Kd * T * Nd2, -Kd * T * (1 - Nd2)),
+                  'epsilon': (-Sq * T * Nd1, Sq * T * (1 - Nd1)),
+                  'gamma': (gamma, gamma),
+                  'vanna': (-q * pdf * d2 / sigma,) * 2,
+                  'volga': (vega * d1 * d2 / sigma,) * 2,
+                  'charm': (div * q * Nd1 - drift, -div * q * (1 - Nd1) - drift),
+                  'veta': (veta, veta)}
+
+    return pd.DataFrame({'{}_{}'.format(greek, type): value[i] for greek, value in values.items()
+                         for i, type in enumerate(['call', 'put'])})
 
 
 class BSM():
     def __init__(self, S, K, daysToMaturity, r, sigma, div=0):
+        """
+        Black-Scholes-Merton model. Every argument can be a scalar or a numpy array (broadcast together),
+        so that whole chains or surfaces are priced at once.
+        """
         self.K = K
         self.r = r
         if r is None: self.r = 0
         self.sigma = sigma
-        if sigma == 0: self.sigma = 1.0e-5
-        self.T = max(daysToMaturity, 0) / float(365)
+        if sigma is not None: self.sigma = floorSigma(sigma)
+        self.T = np.maximum(daysToMaturity, 0) / float(365)
         self.S = S * np.exp(-div * self.T)
+        self.discount = np.exp(-self.r * self.T)
 
         if K is not None and sigma is not None:
             val = self.computeValues()
@@ -37,92 +175,67 @@ class BSM():
         if sigma is None: sigma = self.sigma
         if strike is None: strike = self.K
 
-        d1 = (np.log(self.S / strike) + (self.r + sigma ** 2 * 0.5) * self.T) / float(sigma * np.sqrt(self.T))
-        d2 = d1 - sigma * np.sqrt(self.T)
+        sigmaT = sigma * np.sqrt(self.T)
+        d1 = (np.log(self.S / strike) + (self.r + sigma ** 2 * 0.5) * self.T) / sigmaT
+        d2 = d1 - sigmaT
 
-        return namedtuple('Values', ['d1', 'd2'])(**{
+        return Values(**{
             "d1": d1,
             "d2": d2
         })
 
     def computePrice(self, sigma=None):
-        if sigma == 0: sigma = 1.0e-5
         if sigma is None:
             d1 = self.d1
             d2 = self.d2
         else:
-            d1 = self.computeValues(sigma=sigma).d1
-            d2 = self.computeValues(sigma=sigma).d2
+            d1, d2 = self.computeValues(sigma=floorSigma(sigma))
 
-        output = {'call': self.S * ndtr(d1) - self.K * np.exp(-self.r * self.T) * ndtr(d2),
+        output = {'call': self.S * ndtr(d1) - self.K * self.discount * ndtr(d2),
                   'put': None}
         output['put'] = self.putCallParity(output['call'])
 
-        return namedtuple('Prices', ['call', 'put'])(**{
+        return Prices(**{
             "call": output['call'],
             "put": output['put']
         })
 
     def putCallParity(self, callPrice):
-        return callPrice - self.S + self.K * np.exp(-self.r * self.T)
+        return callPrice - self.S + self.K * self.discount
 
     def getImpliedVolatility(self, marketPrice, type):
-        if marketPrice is np.nan:
-            res = np.nan
-        else:
-            range = {'min': 0, 'max': 10}
-
-            space = np.exp(np.linspace(0, -6, 5))
-            for precision in space:
-                prices = []
-                IVs = np.arange(range['min'], range['max'], precision)
-                for iv in IVs:
-                    if type == 'call':
-                        priceIV = self.computePrice(sigma=iv).call
-                    else:
-                        priceIV = self.computePrice(sigma=iv).put
-
-                    prices.append(priceIV)
-
-                query = findNearest(prices, marketPrice)
-
-                if query is None:
-                    res = np.nan
-                else:
-                    res = IVs[prices.index(query)]
-                    range['min'] = np.amax([res - precision, 0])
-                    range['max'] = res + precision
-
-        if res == 0:
-            res = np.nan
+        """
+        Implied volatility of marketPrice (see solveImpliedVolatility), NaN if not available.
+        """
+        res = solveImpliedVolatility(marketPrice, self.S, self.K, self.T, self.r, 0, type)
 
-        return res
+        return np.where(res == 0, np.nan, res)[()]
 
     # Greeks
     def delta(self):
         deltaCall = ndtr(self.d1)
         deltaPut = deltaCall - 1
 
-        return namedtuple('Delta', ['call', 'put'])(**{
+        return Delta(**{
             "call": deltaCall,
             "put": deltaPut
         })
 
     def gamma(self):
-        gammaCall = norm._pdf(self.d1) / float(self.S * self.sigma * np.sqrt(self.T))
+        gammaCall = norm._pdf(self.d1) / (self.S * self.sigma * np.sqrt(self.T))
         gammaPut = gammaCall
 
-        return namedtuple('Gamma', ['call', 'put'])(**{
+        return Gamma(**{
             "call": gammaCall,
             "put": gammaPut
         })
 
     def theta(self):
-        thetaCall = -self.K * self.r * np.exp(-self.r * self.T) * ndtr(self.d2) - (
+        thetaCall = -self.K * self.r * self.discount * ndtr(self.d2) - (
                     self.sigma * self.S * norm._pdf(self.d1) / (2 * np.sqrt(self.T)))
-        thetaPut = self.K * self.r * np.exp(-self.r * self.T) + thetaCall
+        thetaPut = self.K * self.r * self.discount + thetaCall
 
-        return namedtuple('Theta', ['call', 'put'])(**{
+        return Theta(**{
             "call": thetaCall,
             "put": thetaPut
         })
@@ -131,16 +244,16 @@ class BSM():
         vegaCall = self.S * norm._pdf(self.d1) * np.sqrt(self.T)
         vegaPut = vegaCall
 
-        return namedtuple('Vega', ['call', 'put'])(**{
+        return Vega(**{
             "call": vegaCall,
             "put": vegaPut
         })
 
     def rho(self):
-        rhoCall = self.K * self.T * np.exp(-self.r * self.T) * ndtr(self.d2)
-        rhoPut = rhoCall - self.K * np.exp(-self.r * self.T) * self.T
+        rhoCall = self.K * self.T * self.discount * ndtr(self.d2)
+        rhoPut = rhoCall - self.K * self.discount * self.T
 
-        return namedtuple('Rho', ['call', 'put'])(**{
+        return Rho(**{
             "call": rhoCall,
             "put": rhoPut
         })
@@ -149,17 +262,15 @@ class BSM():
         omegaCall = None
         omegaPut = None
 
-        return namedtuple('Rho', ['call', 'put'])(**{
+        return Omega(**{
             "call": omegaCall,
             "put": omegaPut
         })
 
     def theoreticalDistribution(self, strikes):
-        probability = []
-        for strike in strikes:
-            probability.append(norm._pdf(self.computeValues(strike=strike).d2))
+        probability = list(norm._pdf(self.computeValues(strike=np.asarray(strikes, dtype=float)).d2))
 
-        return namedtuple('Distruibution', ['strike', 'probability'])(**{
+        return Distribution(**{
             "strike": strikes,
             "probability": probability
         })
@@ -43,17 +43,15 @@ class DeepOptionChain():
         # compute theoretical prices
         data = chain.full.copy()
         if self.computeBSM:
-            data['TheoPrice_call'] = None
-            data['TheoPrice_put'] = None
-            for strike in data.strike:
-                if self.optionChain.isPlainVanilla():   # PlainVanilla
-                    option = BSM(price, strike, r, sigma, maturity.days)
-                    optPrice = option.computePrice()
-                else:                                   # American exercise
-                    option = BinomialTree(price, strike, maturity.days, r, sigma, N=80, plainVanilla=False)
-                    optPrice = option.computePrice()
-
-                data.loc[data.strike == strike, ['TheoPrice_call', 'TheoPrice_put']] = [optPrice.call, optPrice.put]
+            if self.optionChain.isPlainVanilla():   # PlainVanilla (whole chain at once)
+                optPrice = BSM(price, data.strike.values, maturity.days, r, sigma).computePrice()
+                data['TheoPrice_call'] = optPrice.call
+                data['TheoPrice_put'] = optPrice.put
+            else:                                   # American exercise
+                optPrices = [BinomialTree(price, strike, maturity.days, r, sigma, N=80,
+                                          plainVanilla=False).computePrice(tree=False) for strike in data.strike]
+                data['TheoPrice_call'] = [optPrice.call for optPrice in optPrices]
+                data['TheoPrice_put'] = [optPrice.put for optPrice in optPrices]
 
             data['avgPrice_call'] = interpolateNaN(data.avgPrice_call)
             data['avgPrice_put'] = interpolateNaN(data.avgPrice_put)
@@ -39,18 +39,10 @@ class ImpliedVolatility():
         output = {}
         for type, contracts in tqdm({'call': self.chain.calls, 'put': self.chain.puts}.items(),
                                     desc='Compute ImpliedVolatility', disable=not self.progressBar):
-            IVs = []
-            d2 = []
-            for index, contract in contracts.iterrows():
-                strike = contract['strike']
+            option = BSM(self.underliyngPrice, contracts['strike'].values, self.maturity.days, self.r, None)
 
-                marketPrice = contract['avgPrice']
-                option = BSM(self.underliyngPrice, strike, self.r, None, self.maturity.days)
-
-                IV = option.getImpliedVolatility(marketPrice, type)
-                IVs.append(IV)
-
-                d2.append(option.computeValues(sigma=IVs[-1]).d2)
+            IVs = option.getImpliedVolatility(contracts['avgPrice'].values, type)
+            d2 = option.computeValues(sigma=IVs).d2
 
             if self.interpolate:
                 IVs = interpolateNaN(IVs)
@@ -44,3 +44,23 @@ def daysToMaturity(expirations, fromDate=None):
 
 def daysFromLastDate(lastDate, expirations):
     return -daysToMaturity(lastDate, expirations)
+
+
+def nearestExpiration(expirations, date: (int, float) = 0, method='nearest'):
+    """
+    Returns the expiration nearest to date.
+    Methods:
+        * nearest -> absoute nearest;
+        * greater -> >=;
+        * less -> <=.
+    """
+    date = int(date)
+
+    if method == 'nearest':
+        return min(expirations, key=lambda x: abs(x - date))
+    elif method == 'greater':
+        return min([i for i in expirations if i >= date], key=lambda x: abs(x - date))
+    elif method == 'less':
+        return min([i for i in expirations if i <= date], key=lambda x: abs(x - date))
+    else:
+        print('Invalid method: {}'.format(method))
@@ -0,0 +1,203 @@
+"""
+tradingCalendar.py
+
+Created by Luca Camerani at 18/10/2026, University of Milano-Bicocca.
+(l.camerani@campus.unimib.it)
+All rights reserved.
+
+This file is part of the EcoFin-Library (https://github.com/LucaCamerani/EcoFin-Library),
+and is released under the "BSD Open Source License".
+
+NYSE trading calendar (full holidays, special closures and 13:00 early closes).
+Dates are unixtimestamps (scalar or array-like) and are evaluated on their UTC day;
+datetime64 and ISO strings are accepted too.
+Coverage: full-day closures follow the holiday rules in force since 1971 (Monday holidays) and the
+unscheduled closures listed in SPECIAL_CLOSURES, so they are accurate from 1971 to the last listed
+closure; later years are projected from the current rules. Early closes follow the current rules
+(July 3rd, day after Thanksgiving, Christmas Eve) and are not accurate before 1996.
+"""
+
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+YEARS = (1970, 2100)
+
+# Full-day closures not covered by the holiday rules (since 1971)
+SPECIAL_CLOSURES = ['1972-11-07', '1976-11-02', '1980-11-04',  # Presidential election days (until 1980)
+                    '1972-12-28',  # President Truman funeral
+                    '1973-01-25',  # President Johnson funeral
+                    '1977-07-14',  # New York City blackout
+                    '1985-09-27',  # Hurricane Gloria
+                    '1994-04-27',  # President Nixon funeral
+                    '2001-09-11', '2001-09-12', '2001-09-13', '2001-09-14',  # September 11
+                    '2004-06-11',  # President Reagan funeral
+                    '2007-01-02',  # President Ford funeral
+                    '2012-10-29', '2012-10-30',  # Hurricane Sandy
+                    '2018-12-05',  # President G.H.W. Bush funeral
+                    '2025-01-09']  # President Carter funeral
+
+
+def weekday(days: np.ndarray):
+    """
+    Returns the weekday of datetime64[D] days (0 = Monday).
+    """
+    return (days.astype('int64') + 3) % 7
+
+
+def monthStart(years: np.ndarray, month: int):
+    return (years - 1970).astype('datetime64[Y]').astype('datetime64[M]') + (month - 1)
+
+
+def nthWeekday(years: np.ndarray, month: int, day: str, n: int):
+    """
+    Returns the n-th day ('Mon', 'Tue', ...) of month; n = -1 for the last one.
+    """
+    if n > 0:
+        return np.busday_offset(monthStart(years, month).astype('datetime64[D]'), n - 1,
+                                roll='forward', weekmask=day)
+    else:
+        return np.busday_offset(monthStart(years, month + 1).astype('datetime64[D]') - 1, n + 1,
+                                roll='backward', weekmask=day)
+
+
+def fixedDay(years: np.ndarray, month: int, day: int):
+    return monthStart(years, month).astype('datetime64[D]') + (day - 1)
+
+
+def observed(days: np.ndarray, saturday: bool = True):
+    """
+    Weekend holidays are observed on Friday (if saturday) or Monday.
+    """
+    wd = weekday(days)
+    days = np.where(wd == 6, days + 1, days)
+    if saturday:
+        days = np.where(wd == 5, days - 1, days)
+    else:
+        days = days[wd != 5]
+
+    return days
+
+
+def easter(years: np.ndarray):
+    """
+    Gregorian Easter Sunday (anonymous algorithm).
+    """
+    a = years % 19
+    b, c = years // 100, years % 100
+    d, e = b // 4, b % 4
+    g = (8 * b + 13) // 25
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = c // 4, c % 4
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 19 * l) // 433
+    month = (h + l - 7 * m + 90) // 25
+    day = (h + l - 7 * m + 33 * month + 19) % 32
+
+    return ((years - 1970).astype('datetime64[Y]').astype('datetime64[M]') + (month - 1)).astype('datetime64[D]') \
+           + (day - 1)
+
+
+@lru_cache(maxsize=1)
+def holidays():
+    """
+    Returns the sorted array (datetime64[D]) of NYSE full-day closures in YEARS.
+    """
+    years = np.arange(*YEARS)
+    days = [observed(fixedDay(years, 1, 1), saturday=False),  # New Year's Day
+            nthWeekday(years[years >= 1998], 1, 'Mon', 3),  # Martin Luther King Jr. Day
+            nthWeekday(years, 2, 'Mon', 3),  # Washington's Birthday
+            easter(years) - 2,  # Good Friday
+            nthWeekday(years, 5, 'Mon', -1),  # Memorial Day
+            observed(fixedDay(years[years >= 2022], 6, 19)),  # Juneteenth
+            observed(fixedDay(years, 7, 4)),  # Independence Day
+            nthWeekday(years, 9, 'Mon', 1),  # Labor Day
+            nthWeekday(years, 11, 'Thu', 4),  # Thanksgiving Day
+            observed(fixedDay(years, 12, 25)),  # Christmas Day
+            np.array(SPECIAL_CLOSURES, dtype='datetime64[D]')]
+
+    return np.unique(np.concatenate(days).astype('datetime64[D]'))
+
+
+@lru_cache(maxsize=1)
+def calendar():
+    return np.busdaycalendar(weekmask='1111100', holidays=holidays())
+
+
+@lru_cache(maxsize=1)
+def earlyCloses():
+    """
+    Returns the sorted array (datetime64[D]) of NYSE 13:00 early closes in YEARS
+    (July 3rd, day after Thanksgiving, Christmas Eve), trading days only.
+    """
+    years = np.arange(*YEARS)
+    july3, christmasEve = fixedDay(years, 7, 3), fixedDay(years, 12, 24)
+    days = np.concatenate([july3[weekday(july3) < 4],
+                           nthWeekday(years, 11, 'Thu', 4) + 1,
+                           christmasEve[weekday(christmasEve) < 4]]).astype('datetime64[D]')
+
+    return np.unique(days[np.is_busday(days, busdaycal=calendar())])
+
+
+def toDays(dates):
+    """
+    Returns dates (unixtimestamps, datetime64 or strings) as datetime64[D] array.
+    """
+    dates = np.asarray(dates)
+    if np.issubdtype(dates.dtype, np.number):
+        return (dates.astype('int64') // 86400).astype('datetime64[D]')
+
+    return dates.astype('datetime64[D]')
+
+
+def unwrap(values: np.ndarray, dates):
+    """
+    Returns values as a Python scalar if dates is a scalar.
+    """
+    if np.ndim(dates) == 0:
+        return np.asarray(values).item()
+
+    return values
+
+
+def isTradingDay(dates):
+    """
+    Returns True where dates are NYSE trading days (a bool for a scalar date).
+
+    >>> isTradingDay(1731888000), isTradingDay('2024-11-16')
+    (True, False)
+    """
+    return unwrap(np.is_busday(toDays(dates), busdaycal=calendar()), dates)
+
+
+def isEarlyClose(dates):
+    """
+    Returns True where dates are NYSE early close (13:00) sessions (a bool for a scalar date).
+    """
+    return unwrap(np.isin(toDays(dates), earlyCloses()), dates)
+
+
+def tradingDays(start: int, end: int, step: int = 86400):
+    """
+    Returns the unixtimestamps in range(start, end, step) falling on NYSE trading days.
+    """
+    dates = np.arange(int(start), int(end), int(step), dtype='int64')
+
+    return dates[isTradingDay(dates)]
+
+
+def closeTime(dates):
+    """
+    Returns the session close (unixtimestamp) of dates: 16:00 New York time, 13:00 on early closes
+    (an int for a scalar date).
+
+    >>> closeTime('2024-11-29')
+    1732903200
+    """
+    days = toDays(dates)
+    hours = np.where(isEarlyClose(days), 13, 16)
+    close = pd.DatetimeIndex(np.ravel(days)).tz_localize('America/New_York') \
+            + pd.to_timedelta(np.ravel(hours), unit='h')
+
+    return unwrap(np.reshape(close.asi8 // 10 ** 9, days.shape), dates)
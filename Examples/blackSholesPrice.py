@@ -10,17 +10,14 @@ and is released under the "BSD Open Source License".
 """
 
 import matplotlib.pyplot as plt
+import numpy as np
 
 from EcoFin.options.blackScholesModel import BSM
 
-prices = {'call': [], 'put': []}
-strikes = range(1, 200, 5)
+strikes = np.arange(1, 200, 5)
 
-for strike in strikes:
-    option = BSM(100, strike, 0.05, 0.2, 365)
-    price = option.computePrice()
-    prices['call'].append(price.call)
-    prices['put'].append(price.put)
+option = BSM(100, strikes, 365, 0.05, 0.2)  # all strikes at once
+prices = option.computePrice()._asdict()
 
 fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(15, 5))
 fig.suptitle('Sample option price')
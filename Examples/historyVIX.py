@@ -22,7 +22,6 @@ from EcoFin.utils.utils import *
 
 # -------------------------[Set-up]-------------------------
 ticker = Ticker('MSFT')
-optionManager = OptionManager(ticker)
 
 # Custom
 increment = 86400  # 1 day
@@ -33,27 +32,28 @@ date2 = date1 + increment * 365 * 3
 ticker_info = ticker.getInfo()
 
 output = []
-for now in tqdm(range(date1, date2, increment), desc='Compute history'):  # Compute day by day
-    if optionManager.setNow(now) is not False:
-        exp = optionManager.getExpirationByMaturity(5, method='greater')
-        optionChain = optionManager.getOptionChain(exp=exp)
-        deepOptionChain = DeepOptionChain(optionChain, computeIV=True, progressBar=False)
-
-        VIX = EquityVIX(deepOptionChain)
-
-        summary = {'Date': unixtimestamp_to_date(optionChain.getChainDate()),
-                   'SpotPrice': optionChain.getSpotPrice(),
-                   'CBOE_VIX': VIX.getCBOEVIX(),
-                   'Mean': VIX.getMeanVIX().value,
-                   'Beta': VIX.getBetaVIX().value,
-                   'ATM': VIX.getATMVIX().value,
-                   'OI': VIX.getOpenInterestVIX().value
-                   }
-
-        if len(output) == 0:
-            output = pd.DataFrame(columns=list(summary.keys()), index=[])
-
-        output = output.append(summary, ignore_index=True)
+# Compute day by day (NYSE trading days with data), next days downloaded in background
+for optionManager in tqdm(OptionManager(ticker, load=False).iterDays(date1, date2, [(5, 'greater')], step=increment),
+                          desc='Compute history'):
+    exp = optionManager.getExpirationByMaturity(5, method='greater')
+    optionChain = optionManager.getOptionChain(exp=exp)
+    deepOptionChain = DeepOptionChain(optionChain, computeIV=True, progressBar=False)
+
+    VIX = EquityVIX(deepOptionChain)
+
+    summary = {'Date': unixtimestamp_to_date(optionChain.getChainDate()),
+               'SpotPrice': optionChain.getSpotPrice(),
+               'CBOE_VIX': VIX.getCBOEVIX(),
+               'Mean': VIX.getMeanVIX().value,
+               'Beta': VIX.getBetaVIX().value,
+               'ATM': VIX.getATMVIX().value,
+               'OI': VIX.getOpenInterestVIX().value
+               }
+
+    if len(output) == 0:
+        output = pd.DataFrame(columns=list(summary.keys()), index=[])
+
+    output = output.append(summary, ignore_index=True)
 
 fig, axs = plt.subplots(3, figsize=(15, 8), sharex=True, gridspec_kw={'height_ratios': [3, 3, 5]})
 fig.suptitle('Option Volatility Smile analysis ({})'.format(ticker_info.ticker), fontsize=16)
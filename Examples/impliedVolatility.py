@@ -14,7 +14,7 @@ import time
 from EcoFin.options.blackScholesModel import BSM
 
 marketPrice = 3
-option = BSM(100, 100, 0.05, 0.2, 70)
+option = BSM(100, 100, 70, 0.05, 0.2)
 
 start_time = time.time()  # [START]
 
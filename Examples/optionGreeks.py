@@ -11,7 +11,7 @@ and is released under the "BSD Open Source License".
 
 from EcoFin.options.blackScholesModel import BSM
 
-option = BSM(100, 100, 0.05, 0.2, 70)
+option = BSM(100, 100, 70, 0.05, 0.2)
 
 print(option.computeValues())
 # -----
@@ -10,30 +10,14 @@ and is released under the "BSD Open Source License".
 """
 
 import matplotlib.pyplot as plt
-import pandas as pd
 
-from EcoFin.options.blackScholesModel import BSM
+from EcoFin.options.blackScholesModel import greeks as computeGreeks
 
 greeks = {'Delta': [], 'Gamma': [], 'Theta': [], 'Vega': [], 'Rho': []}
 
 strikes = range(1, 200, 1)
-data = pd.DataFrame(index=strikes, columns=greeks)
-data = data.merge(data, left_index=True, right_index=True, suffixes=['_call', '_put'])
-
-for strike, row in data.iterrows():
-    option = BSM(100, strike, 0.05, 0.2, 40)
-
-    data.loc[strike, 'Delta_call'] = option.delta().call
-    data.loc[strike, 'Gamma_call'] = option.gamma().call
-    data.loc[strike, 'Theta_call'] = option.theta().call
-    data.loc[strike, 'Vega_call'] = option.vega().call
-    data.loc[strike, 'Rho_call'] = option.rho().call
-
-    data.loc[strike, 'Delta_put'] = option.delta().put
-    data.loc[strike, 'Gamma_put'] = option.gamma().put
-    data.loc[strike, 'Theta_put'] = option.theta().put
-    data.loc[strike, 'Vega_put'] = option.vega().put
-    data.loc[strike, 'Rho_put'] = option.rho().put
+data = computeGreeks(100, strikes, 40 / 365, 0.05, 0.2)
+data.columns = [column.capitalize() for column in data.columns]
 
 # create plots with results
 for greek in greeks.keys():
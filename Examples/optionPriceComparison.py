@@ -42,14 +42,9 @@ forwardPrice = optionChain.getForwardPrice()
 fig, ax = plt.subplots()
 
 chain = optionChain.getChain()
-theoreticalPrices = {'call': [], 'put': []}
 
-for strike in strikeList:
-    option = BSM(price, strike, r, sigma, maturity)
-    optPrice = option.computePrice()
-
-    theoreticalPrices['call'].append(optPrice.call)
-    theoreticalPrices['put'].append(optPrice.put)
+option = BSM(price, np.array(strikeList), maturity, r, sigma)
+theoreticalPrices = option.computePrice()._asdict()
 
 ax.plot(strikeList, theoreticalPrices['call'], linestyle="dotted", label='Theoretical call')
 ax.plot(strikeList, theoreticalPrices['put'], linestyle="dotted", label='Theoretical put')
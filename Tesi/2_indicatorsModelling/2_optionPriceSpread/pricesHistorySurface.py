@@ -31,9 +31,11 @@ date1 = 1514761200  # 04 January 2018
 date2 = date1 + increment * 200
 # -------------------------------------------------------------------
 
-for now in tqdm.tqdm(range(date1, date2, increment), desc='Generate frames'):  # Compute day by day
+# Compute day by day (NYSE trading days with data), next surfaces downloaded in background
+for optionManager in tqdm.tqdm(OptionManager(ticker, load=False).iterDays(date1, date2, surface=True, step=increment),
+                               desc='Generate frames'):
     try:
-        optionManager = OptionManager(ticker, now=now)
+        now = optionManager.getNow()
         optSurface = optionManager.getOptionSurface()
         deepSurface = DeepOptionSurface(optSurface, computeIV=False, computeBSM=False, progressBar=False)
 
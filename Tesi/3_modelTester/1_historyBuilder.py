@@ -9,7 +9,6 @@ This file is part of the EcoFin-Library (https://github.com/LucaCamerani/EcoFin-
 and is released under the "BSD Open Source License".
 """
 
-import datetime
 import os
 from multiprocessing import Pool
 
@@ -26,6 +25,8 @@ from EcoFin.utils.utils import *
 
 # -------------------------[Set-up]-------------------------
 setIP(r'http://127.0.0.1:5000/')
+os.makedirs('../Export', exist_ok=True)
+setCache(r'../Export/cache.sqlite')  # on-disk cache shared by Pool workers
 ticker_list = [line.rstrip('\n') for line in open(r'../INDEXs/DJIA.txt')]
 
 multiprocess = True  # use Pool multiprocess system
@@ -48,58 +49,58 @@ date2 = date1 + increment * 7
 
 def execute(tick: str):
     ticker = Ticker(tick)
-    optionManager = OptionManager(ticker)
 
     output = pd.DataFrame
-    for now in range(date1, date2, increment):  # Compute day by day
+    # Compute day by day (NYSE trading days with data), next days downloaded in background
+    for optionManager in OptionManager(ticker, load=False).iterDays(date1, date2, [(maturity_min, 'greater')],
+                                                                    step=increment):
+        now = optionManager.getNow()
         try:
-            # Exclude bad results and weekends
-            if optionManager.setNow(now) is not False and datetime.fromtimestamp(now).weekday() not in [5, 6]:
-                exp = optionManager.getExpirationByMaturity(maturity_min, method='greater')
-                optionChain = optionManager.getOptionChain(exp=exp)
-                deepOptionChain = DeepOptionChain(optionChain, computeIV=computeIV, progressBar=False)
-
-                summary = {'Date': unixtimestamp_to_date(optionChain.getChainDate()),
-                           'Exp': unixtimestamp_to_date(optionChain.getChainExpiration()),
-                           'Maturity': optionChain.getTimeToMaturity().days,
-                           'ForwardPrice': optionChain.getForwardPrice(),
-                           'SpotPrice': optionChain.getSpotPrice(),
-                           }
-
-                # compute signals
-                chainWeights = ChainWeights(optionChain)
-                for mode, weights in {'EW': chainWeights.computeEquallyWeights(),
-                                      'Beta': chainWeights.computeBetaWeights(),
-                                      'ATM': chainWeights.computeATMWeights(),
-                                      'OI': chainWeights.computeOpenInterestsWeights(),
-                                      'Moneyness': chainWeights.computeMoneynessWeights()}.items():
-                    synopsis = OptionChainSinopsys(deepOptionChain, weights=weights)
-
-                    OPS = synopsis.computeOptionPriceSpread()
-                    IVS = synopsis.computeImpliedVolatilitySpread()
-                    NAP = synopsis.computeNoArbitragePrice()
-                    OIR = synopsis.computeOpenInterestRatio()
-
-                    summary['OPS_[{}]'.format(mode)] = OPS.mean
-                    summary['IVS_[{}]'.format(mode)] = IVS.mean
-                    summary['NAP_[{}]'.format(mode)] = NAP.value
-                    summary['NAP_ret_[{}]'.format(mode)] = NAP.ret
-                    summary['OIR_[{}]'.format(mode)] = OIR.mean
-
-                PCD = synopsis.computePutCallDelta()
-                summary['PCD'] = PCD
-
-                # Compute volatility metrics
-                VIX = EquityVIX(deepOptionChain)
-                summary['VIX_[hist]'] = VIX.getHistoricalVolatility()
-                summary['VIX_[mean]'] = VIX.getMeanVIX().value
-                summary['VIX_[beta]'] = VIX.getBetaVIX().value
-                summary['VIX_[CBOE]'] = VIX.getCBOEVIX()
-
-                if output.empty:
-                    output = pd.DataFrame(columns=list(summary.keys()), index=[])
-
-                output = output.append(summary, ignore_index=True)
+            exp = optionManager.getExpirationByMaturity(maturity_min, method='greater')
+            optionChain = optionManager.getOptionChain(exp=exp)
+            deepOptionChain = DeepOptionChain(optionChain, computeIV=computeIV, progressBar=False)
+
+            summary = {'Date': unixtimestamp_to_date(optionChain.getChainDate()),
+                       'Exp': unixtimestamp_to_date(optionChain.getChainExpiration()),
+                       'Maturity': optionChain.getTimeToMaturity().days,
+                       'ForwardPrice': optionChain.getForwardPrice(),
+                       'SpotPrice': optionChain.getSpotPrice(),
+                       }
+
+            # compute signals
+            chainWeights = ChainWeights(optionChain)
+            for mode, weights in {'EW': chainWeights.computeEquallyWeights(),
+                                  'Beta': chainWeights.computeBetaWeights(),
+                                  'ATM': chainWeights.computeATMWeights(),
+                                  'OI': chainWeights.computeOpenInterestsWeights(),
+                                  'Moneyness': chainWeights.computeMoneynessWeights()}.items():
+                synopsis = OptionChainSinopsys(deepOptionChain, weights=weights)
+
+                OPS = synopsis.computeOptionPriceSpread()
+                IVS = synopsis.computeImpliedVolatilitySpread()
+                NAP = synopsis.computeNoArbitragePrice()
+                OIR = synopsis.computeOpenInterestRatio()
+
+                summary['OPS_[{}]'.format(mode)] = OPS.mean
+                summary['IVS_[{}]'.format(mode)] = IVS.mean
+                summary['NAP_[{}]'.format(mode)] = NAP.value
+                summary['NAP_ret_[{}]'.format(mode)] = NAP.ret
+                summary['OIR_[{}]'.format(mode)] = OIR.mean
+
+            PCD = synopsis.computePutCallDelta()
+            summary['PCD'] = PCD
+
+            # Compute volatility metrics
+            VIX = EquityVIX(deepOptionChain)
+            summary['VIX_[hist]'] = VIX.getHistoricalVolatility()
+            summary['VIX_[mean]'] = VIX.getMeanVIX().value
+            summary['VIX_[beta]'] = VIX.getBetaVIX().value
+            summary['VIX_[CBOE]'] = VIX.getCBOEVIX()
+
+            if output.empty:
+                output = pd.DataFrame(columns=list(summary.keys()), index=[])
+
+            output = output.append(summary, ignore_index=True)
         except Exception as e:
             logs.append('Error with [{}] - [{}]: {}'.format(ticker.ticker, now, e))
             pass
@@ -23,5 +23,7 @@ setup(
     long_description=README,
     long_description_content_type="text/markdown",
     include_package_data=True,
-    install_requires=REQ
+    install_requires=REQ,
+    extras_require={'async': ['aiohttp~=3.7']},
+    entry_points={'console_scripts': ['ecofin-prefetch=EcoFin.dataDownload.prefetch:main']}
 )